@@ -1,1644 +1,1819 @@
-import sys
-import time
-import csv
-import pyvisa
-from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QComboBox, QMessageBox, QMainWindow, QStackedWidget, QRadioButton, QButtonGroup,
-    QGridLayout, QScrollArea, QLineEdit, QFileDialog, QGroupBox, QSizePolicy, QDialog
-)
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QFont
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from matplotlib.ticker import MultipleLocator
-import matplotlib
-import matplotlib.font_manager as font_manager
-from multiprocessing import Event, Manager
-import math
-from threading import Thread
-
-# 利用可能なフォントから日本語フォントを探す
-available_fonts = [f.name for f in font_manager.fontManager.ttflist]
-japanese_fonts = [name for name in available_fonts if
-                  any(word in name for word in ['Yu Gothic', 'Meiryo', 'MS Gothic', 'Noto Sans CJK JP'])]
-
-if japanese_fonts:
-    matplotlib.rcParams['font.family'] = japanese_fonts
-else:
-    matplotlib.rcParams['font.family'] = ['sans-serif']
-
-rm = pyvisa.ResourceManager()
-
-
-def format_si_unit(value, unit='Ω'):
-    if value == 'Overload' or value is None or math.isnan(value):
-        return "Overload"
-
-    si_prefixes = {
-        -9: 'n',
-        -6: 'μ',
-        -3: 'm',
-        0: '',
-        3: 'k',
-        6: 'M',
-        9: 'G',
-    }
-
-    if value == 0:
-        exponent = 0
-    else:
-        exponent = int(math.floor(math.log10(abs(value))))
-        exponent = exponent - (exponent % 3)
-
-    min_exponent = min(si_prefixes.keys())
-    max_exponent = max(si_prefixes.keys())
-    exponent = max(min(exponent, max_exponent), min_exponent)
-
-    scaled_value = value / (10 ** exponent)
-    prefix = si_prefixes[exponent]
-    return f"{scaled_value:.6g} {prefix}{unit}"
-
-
-class MeasurementClass(Thread):
-    def __init__(self, command_queue, data_list, resource_name, stop_event, is_ready_event):
-        super().__init__()
-        self.dmm = None
-        self.command_queue = command_queue
-        self.data_list = data_list
-        self.resource_name = resource_name
-        self.stop_event = stop_event
-        self.is_ready_event = is_ready_event
-
-    def run(self):
-        rm = pyvisa.ResourceManager()
-        try:
-            self.dmm = rm.open_resource(self.resource_name)
-            self.dmm.timeout = 10000
-            self.dmm.read_termination = '\n'
-            self.dmm.write_termination = '\n'
-        except Exception as e:
-            print(f"MeasurementClass: 機器のオープンに失敗しました: {e}")
-            return
-
-        start_time = time.time()
-
-        while not self.stop_event.is_set():
-            self.check_commands()
-            try:
-                ach_value, bch_value = self.read_measurement()
-                if ach_value is not None:
-                    timestamp = time.time() - start_time
-                    self.data_list.append((timestamp, ach_value, bch_value))
-                    if not self.is_ready_event.is_set():
-                        self.is_ready_event.set()
-            except Exception as e:
-                print(f"MeasurementClass: 例外が発生しました: {e}")
-            time.sleep(0.005)
-
-        self.dmm.close()
-        print("MeasurementClass: プロセスが終了しました。")
-
-    def check_commands(self):
-        while not self.command_queue.empty():
-            command = self.command_queue.get()
-            if command == "STOP":
-                self.stop_event.set()
-            elif command.startswith("SEND "):
-                cmd = command[5:]
-                self.send_command(cmd)
-            elif command == "TRIGGER":
-                self.send_command("*TRG")
-
-    def send_command(self, command):
-        try:
-            self.dmm.write("*CLS")
-            self.dmm.clear()
-            time.sleep(0.2)
-
-            self.dmm.write(command)
-            time.sleep(0.2)
-
-            self.dmm.write("*OPC?")
-            while True:
-                try:
-                    ready = self.dmm.read().strip()
-                    if ready == "1":
-                        break
-                except pyvisa.errors.VisaIOError:
-                    time.sleep(0.2)
-        except Exception as e:
-            print(f"MeasurementClass: コマンドの送信中にエラーが発生しました: {e}")
-
-    def read_measurement(self):
-        try:
-            measurement = self.dmm.read().strip()
-            parts = measurement.split(",")
-            ach_value = None
-            bch_value = None
-
-            for part in parts:
-                part = part.strip()
-                if not part:
-                    continue
-
-                tokens = part.split()
-                if len(tokens) < 2:
-                    continue
-
-                prefix = tokens[0]
-                value_str = tokens[1]
-
-                if prefix.endswith('_'):
-                    try:
-                        value = float(value_str)
-                        if value == -0.0:
-                            value = 0.0
-                    except ValueError:
-                        continue
-                elif prefix.endswith('O'):
-                    value = 'Overload'
-                else:
-                    continue
-
-                if ach_value is None:
-                    ach_value = value
-                elif bch_value is None:
-                    bch_value = value
-
-            if ach_value is None:
-                return None, None
-
-            return ach_value, bch_value
-        except pyvisa.errors.VisaIOError:
-            return None, None
-
-
-class DeviceSelectionPage(QWidget):
-    def __init__(self, resources):
-        super().__init__(parent=None)
-        self.resources = resources
-        self.selected_resource = None
-
-        layout = QVBoxLayout()
-        label = QLabel("以下の機器が見つかりました:")
-        layout.addWidget(label)
-
-        self.combo = QComboBox(parent=None)
-        self.combo.addItems(resources)
-        layout.addWidget(self.combo)
-
-        self.next_button = QPushButton("次へ")
-        self.next_button.setFixedSize(100, 40)
-        layout.addWidget(self.next_button, alignment=Qt.AlignRight)
-
-        self.setLayout(layout)
-
-
-class DMMSetupPage(QWidget):
-    def __init__(self, jig_modes):
-        super().__init__(parent=None)
-        self.jig_modes = jig_modes
-        self.measurement_options = [
-            ("F1", "直流電圧測定 (DCV-Ach)", "DCV", "V"),
-            ("F2", "交流電圧測定 (ACV-Ach)", "ACV", "V"),
-            ("F3", "抵抗測定 (2WΩ-Ach)", "OHM", "Ω"),
-            ("F5", "直流電流測定 (DCI-Ach)", "DCI", "A"),
-            ("F6", "交流電流測定 (ACI-Ach)", "ACI", "A"),
-            ("F7", "交流電圧測定 (AC+DC結合)", "ACVDCV", "V"),
-            ("F8", "交流電流測定 (AC+DC結合)", "ACIDCI", "A"),
-            ("F12", "Bch 直流電圧測定 (DCV-Bch)", "BDV", "V"),
-            ("F13", "ダイオード測定 (DIODE-Ach)", "DIODE", "V"),
-            ("F20", "ローパワー2WΩ(LP-2W-Ach)", "LP2W", "Ω"),
-            ("F22", "導通テスト (CONT-Ach)", "CONT", "Ω"),
-            ("F35", "Bch 直流電流測定 (DCI-Bch)", "BDI", "A"),
-            ("F36", "Bch 交流電流測定 (ACI-Bch)", "BAI", "A"),
-            ("F37", "Bch 交流電流測定 (AC+DC結合)", "BAIDCI", "A"),
-            ("F40", "温度測定 (TEMP)", "TEMP", "℃"),
-            ("F50", "周波数測定 (FREQ-Ach)", "FREQ", "Hz"),
-            ("DE0", "OFF", "", ""),
-        ]
-        self.range_dict = {
-            "F1": [
-                ("R0", "AUTO"),
-                ("R3", "200 mV"),
-                ("R4", "2 V"),
-                ("R5", "20 V"),
-                ("R6", "200 V"),
-                ("R7", "1000 V"),
-            ],
-            "F2": [
-                ("R0", "AUTO"),
-                ("R3", "200 mV"),
-                ("R4", "2 V"),
-                ("R5", "20 V"),
-                ("R6", "200 V"),
-                ("R7", "700 V"),
-            ],
-            "F3": [
-                ("R0", "AUTO"),
-                ("R3", "200 Ω"),
-                ("R4", "2 kΩ"),
-                ("R5", "20 kΩ"),
-                ("R6", "200 kΩ"),
-                ("R7", "2 MΩ"),
-                ("R8", "20 MΩ"),
-                ("R9", "200 MΩ"),
-            ],
-            "F5": [
-                ("R0", "AUTO"),
-                ("R1", "2000 nA"),
-                ("R2", "20 μA"),
-                ("R3", "200 μA"),
-                ("R4", "2 mA"),
-                ("R5", "20 mA"),
-                ("R6", "200 mA"),
-                ("R7", "2000 mA"),
-            ],
-            "F6": [
-                ("R0", "AUTO"),
-                ("R3", "200 μA"),
-                ("R4", "2 mA"),
-                ("R5", "20 mA"),
-                ("R6", "200 mA"),
-                ("R7", "2000 mA"),
-            ],
-            "F7": [
-                ("R0", "AUTO"),
-                ("R3", "200 mV"),
-                ("R4", "2 V"),
-                ("R5", "20 V"),
-                ("R6", "200 V"),
-                ("R7", "700 V"),
-            ],
-            "F8": [
-                ("R0", "AUTO"),
-                ("R3", "200 μA"),
-                ("R4", "2 mA"),
-                ("R5", "20 mA"),
-                ("R6", "200 mA"),
-                ("R7", "2000 mA"),
-            ],
-            "F12": [
-                ("R0", "AUTO"),
-                ("R3", "200 mV"),
-                ("R4", "2 V"),
-                ("R5", "20 V"),
-                ("R6", "200 V"),
-            ],
-            "F13": [
-                ("R0", "AUTO"),
-                ("R3", "200 Ω"),
-                ("R4", "2 kΩ"),
-                ("R5", "20 kΩ"),
-                ("R6", "200 kΩ"),
-                ("R7", "2 MΩ"),
-                ("R8", "20 MΩ"),
-                ("R9", "200 MΩ"),
-            ],
-            "F20": [
-                ("R0", "AUTO"),
-                ("R3", "200 Ω"),
-                ("R4", "2 kΩ"),
-                ("R5", "20 kΩ"),
-                ("R6", "200 kΩ"),
-                ("R7", "2 MΩ"),
-                ("R8", "20 MΩ"),
-            ],
-            "F22": [
-                ("R0", "AUTO"),
-                ("R3", "200 Ω"),
-                ("R4", "2 kΩ"),
-                ("R5", "20 kΩ"),
-                ("R6", "200 kΩ"),
-                ("R7", "2 MΩ"),
-                ("R8", "20 MΩ"),
-                ("R9", "200 MΩ"),
-            ],
-            "F35": [
-                ("R8", "10 A"),
-            ],
-            "F36": [
-                ("R8", "10 A"),
-            ],
-            "F37": [
-                ("R8", "10 A"),
-            ]
-        }
-
-        main_layout = QVBoxLayout()
-        font = QFont()
-        font.setPointSize(14)
-        self.setFont(font)
-
-        mode_selection_group = QGroupBox("測定モードを選択してください")
-        mode_selection_layout = QHBoxLayout()
-        self.mode_group = QButtonGroup(parent=None)
-        self.normal_mode_radio = QRadioButton("通常測定モード")
-        self.jig_mode_radio = QRadioButton("ジグ使用計測モード")
-        self.mode_group.addButton(self.normal_mode_radio, id=0)
-        self.mode_group.addButton(self.jig_mode_radio, id=1)
-        self.normal_mode_radio.setChecked(True)
-
-        mode_selection_layout.addWidget(self.normal_mode_radio)
-        mode_selection_layout.addWidget(self.jig_mode_radio)
-        mode_selection_group.setLayout(mode_selection_layout)
-        main_layout.addWidget(mode_selection_group)
-
-        self.jig_selection_group = QGroupBox("ジグ測定モードを選択してください")
-        jig_selection_layout = QHBoxLayout()
-        self.jig_selection_combo = QComboBox(parent=None)
-        for jig_mode in self.jig_modes:
-            self.jig_selection_combo.addItem(jig_mode[0])
-        jig_selection_layout.addWidget(self.jig_selection_combo)
-        self.jig_selection_group.setLayout(jig_selection_layout)
-        self.jig_selection_group.hide()
-        main_layout.addWidget(self.jig_selection_group)
-
-        scroll = QScrollArea(parent=None)
-        scroll.setWidgetResizable(True)
-        scroll_widget = QWidget(parent=None)
-        scroll.setWidget(scroll_widget)
-        scroll_layout = QVBoxLayout(scroll_widget)
-
-        dsp1_group = QGroupBox("DSP1 の設定")
-        dsp1_layout = QVBoxLayout()
-        dsp1_options_layout = QGridLayout()
-
-        self.dsp1_option_group = QButtonGroup(parent=None)
-        for idx, (key, desc, prefix, unit) in enumerate(self.measurement_options):
-            if key == "DE0":
-                continue
-            btn = QRadioButton(desc)
-            self.dsp1_option_group.addButton(btn, idx)
-            dsp1_options_layout.addWidget(btn, idx // 4, idx % 4)
-        if self.dsp1_option_group.buttons():
-            self.dsp1_option_group.buttons()[0].setChecked(True)
-        dsp1_layout.addLayout(dsp1_options_layout)
-
-        dsp1_range_label = QLabel("レンジを選択してください:")
-        dsp1_layout.addWidget(dsp1_range_label)
-        self.dsp1_range_group = QButtonGroup(parent=None)
-        self.dsp1_range_layout = QGridLayout()
-        dsp1_layout.addLayout(self.dsp1_range_layout)
-        self.update_dsp1_ranges()
-
-        self.dsp1_option_group.buttonClicked.connect(self.update_dsp1_ranges)
-        dsp1_group.setLayout(dsp1_layout)
-        scroll_layout.addWidget(dsp1_group)
-
-        dsp2_group = QGroupBox("DSP2 の設定")
-        dsp2_layout = QVBoxLayout()
-        dsp2_options_layout = QGridLayout()
-
-        self.dsp2_option_group = QButtonGroup(parent=None)
-        for idx, (key, desc, prefix, unit) in enumerate(self.measurement_options):
-            btn = QRadioButton(desc)
-            self.dsp2_option_group.addButton(btn, idx)
-            dsp2_options_layout.addWidget(btn, idx // 4, idx % 4)
-        if self.dsp2_option_group.buttons():
-            self.dsp2_option_group.buttons()[0].setChecked(False)
-        dsp2_layout.addLayout(dsp2_options_layout)
-
-        dsp2_range_label = QLabel("レンジを選択してください:")
-        dsp2_layout.addWidget(dsp2_range_label)
-        self.dsp2_range_group = QButtonGroup(parent=None)
-        self.dsp2_range_layout = QGridLayout()
-        dsp2_layout.addLayout(self.dsp2_range_layout)
-        self.update_dsp2_ranges()
-
-        self.dsp2_option_group.buttonClicked.connect(self.update_dsp2_ranges)
-        dsp2_group.setLayout(dsp2_layout)
-        scroll_layout.addWidget(dsp2_group)
-
-        trigger_sampling_layout = QVBoxLayout()
-
-        trigger_group = QGroupBox("トリガーモード")
-        trigger_layout = QHBoxLayout()
-        self.trigger_group = QButtonGroup(parent=None)
-        self.trigger_radio1 = QRadioButton("IMMEDIATE (TRS0)")
-        self.trigger_radio1.setChecked(True)
-        self.trigger_radio3 = QRadioButton("BUS (TRS3)")
-        self.trigger_group.addButton(self.trigger_radio1)
-        self.trigger_group.addButton(self.trigger_radio3)
-        trigger_layout.addWidget(self.trigger_radio1)
-        trigger_layout.addWidget(self.trigger_radio3)
-        trigger_group.setLayout(trigger_layout)
-
-        sampling_group = QGroupBox("サンプリングレート")
-        sampling_layout = QHBoxLayout()
-        self.sampling_group = QButtonGroup(parent=None)
-        self.sampling_radio1 = QRadioButton("FAST (PR1)")
-        self.sampling_radio1.setChecked(True)
-        self.sampling_radio2 = QRadioButton("MED (PR2)")
-        self.sampling_radio3 = QRadioButton("SLOW1 (PR3)")
-        self.sampling_radio4 = QRadioButton("SLOW2 (PR4)")
-        self.sampling_group.addButton(self.sampling_radio1)
-        self.sampling_group.addButton(self.sampling_radio2)
-        self.sampling_group.addButton(self.sampling_radio3)
-        self.sampling_group.addButton(self.sampling_radio4)
-        sampling_layout.addWidget(self.sampling_radio1)
-        sampling_layout.addWidget(self.sampling_radio2)
-        sampling_layout.addWidget(self.sampling_radio3)
-        sampling_layout.addWidget(self.sampling_radio4)
-        sampling_group.setLayout(sampling_layout)
-
-        auto_zero_group = QGroupBox("オートゼロ設定")
-        auto_zero_layout = QHBoxLayout()
-        self.auto_zero_group = QButtonGroup(parent=None)
-        self.auto_zero_radio_off = QRadioButton("OFF")
-        self.auto_zero_radio_on = QRadioButton("ON")
-        self.auto_zero_radio_once = QRadioButton("ONCE (一度実行後、OFF)")
-        self.auto_zero_group.addButton(self.auto_zero_radio_off, id=0)
-        self.auto_zero_group.addButton(self.auto_zero_radio_on, id=1)
-        self.auto_zero_group.addButton(self.auto_zero_radio_once, id=2)
-        self.auto_zero_radio_off.setChecked(True)
-        auto_zero_layout.addWidget(self.auto_zero_radio_off)
-        auto_zero_layout.addWidget(self.auto_zero_radio_on)
-        auto_zero_layout.addWidget(self.auto_zero_radio_once)
-        auto_zero_group.setLayout(auto_zero_layout)
-
-        trigger_auto_zero_layout = QHBoxLayout()
-        trigger_auto_zero_layout.addWidget(trigger_group)
-        trigger_auto_zero_layout.addWidget(auto_zero_group)
-
-        trigger_sampling_layout.addLayout(trigger_auto_zero_layout)
-        trigger_sampling_layout.addWidget(sampling_group)
-        scroll_layout.addLayout(trigger_sampling_layout)
-
-        main_layout.addWidget(scroll)
-
-        button_layout = QHBoxLayout()
-        self.next_button = QPushButton("次へ")
-        self.next_button.setFixedSize(100, 40)
-        button_layout.addStretch()
-        button_layout.addWidget(self.next_button)
-        main_layout.addLayout(button_layout)
-
-        self.setLayout(main_layout)
-        self.mode_group.buttonClicked.connect(self.handle_mode_selection)
-        self.jig_selection_combo.currentIndexChanged.connect(self.handle_jig_mode_selection)
-
-    def handle_mode_selection(self, button):
-        mode_id = self.mode_group.id(button)
-        if mode_id == 0:
-            self.set_normal_mode()
-        else:
-            self.set_jig_mode()
-
-    def handle_jig_mode_selection(self):
-        self.update_dsp1_ranges()
-        self.update_dsp2_ranges()
-
-    def set_normal_mode(self):
-        self.jig_selection_group.hide()
-        for btn in self.dsp1_option_group.buttons():
-            btn.setEnabled(True)
-        for btn in self.dsp2_option_group.buttons():
-            btn.setEnabled(True)
-
-        if not any(btn.isChecked() for btn in self.dsp2_option_group.buttons()):
-            for btn in self.dsp2_option_group.buttons():
-                if btn.text() == "OFF":
-                    btn.setChecked(True)
-                    break
-
-    def set_jig_mode(self):
-        self.jig_selection_group.show()
-        self.jig_selection_combo.setCurrentIndex(0)
-        self.update_dsp1_ranges()
-        self.update_dsp2_ranges()
-        for btn in self.dsp1_option_group.buttons():
-            btn.setEnabled(False)
-        for btn in self.dsp2_option_group.buttons():
-            btn.setEnabled(False)
-
-    def update_dsp1_ranges(self):
-        for btn in self.dsp1_range_group.buttons():
-            self.dsp1_range_group.removeButton(btn)
-            btn.deleteLater()
-        for i in reversed(range(self.dsp1_range_layout.count())):
-            widget = self.dsp1_range_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        mode_id = self.mode_group.checkedId()
-        if mode_id == 1:
-            jig_mode_name = self.jig_selection_combo.currentText()
-            dsp1_key = None
-            for jig_mode in self.jig_modes:
-                if jig_mode[0] == jig_mode_name:
-                    dsp1_key = jig_mode[1]
-                    break
-            if dsp1_key is None:
-                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP1キーが見つかりません。")
-                return
-        else:
-            idx = self.dsp1_option_group.checkedId()
-            if idx == -1:
-                QMessageBox.critical(self, "エラー", "DSP1の測定項目が選択されていません。")
-                return
-            dsp1_key = self.measurement_options[idx][0]
-
-        if dsp1_key and dsp1_key in self.range_dict:
-            ranges = self.range_dict[dsp1_key]
-            for r_idx, (range_key, range_desc) in enumerate(ranges):
-                btn = QRadioButton(range_desc)
-                self.dsp1_range_group.addButton(btn, r_idx)
-                self.dsp1_range_layout.addWidget(btn, r_idx // 8, r_idx % 8)
-            if self.dsp1_range_group.buttons():
-                self.dsp1_range_group.buttons()[0].setChecked(True)
-        else:
-            label = QLabel("レンジ設定はありません")
-            self.dsp1_range_layout.addWidget(label)
-
-    def update_dsp2_ranges(self):
-        for btn in self.dsp2_range_group.buttons():
-            self.dsp2_range_group.removeButton(btn)
-            btn.deleteLater()
-        for i in reversed(range(self.dsp2_range_layout.count())):
-            widget = self.dsp2_range_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        mode_id = self.mode_group.checkedId()
-        if mode_id == 1:
-            jig_mode_name = self.jig_selection_combo.currentText()
-            dsp2_key = None
-            for jig_mode in self.jig_modes:
-                if jig_mode[0] == jig_mode_name:
-                    dsp2_key = jig_mode[2]
-                    break
-            if dsp2_key is None:
-                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP2キーが見つかりません。")
-                return
-        else:
-            idx = self.dsp2_option_group.checkedId()
-            if idx == -1:
-                label = QLabel("DSP2は選択されていません。")
-                self.dsp2_range_layout.addWidget(label)
-                return
-            dsp2_key = self.measurement_options[idx][0]
-
-        if dsp2_key and dsp2_key in self.range_dict:
-            ranges = self.range_dict.get(dsp2_key, [])
-            for r_idx, (range_key, range_desc) in enumerate(ranges):
-                btn = QRadioButton(range_desc)
-                self.dsp2_range_group.addButton(btn, r_idx)
-                self.dsp2_range_layout.addWidget(btn, r_idx // 8, r_idx % 8)
-            if self.dsp2_range_group.buttons():
-                self.dsp2_range_group.buttons()[0].setChecked(True)
-        else:
-            label = QLabel("レンジ設定はありません")
-            self.dsp2_range_layout.addWidget(label)
-
-    def get_setup_commands(self):
-        commands = []
-        mode_id = self.mode_group.checkedId()
-        if mode_id == 0:
-            idx = self.dsp1_option_group.checkedId()
-            if idx == -1:
-                QMessageBox.critical(self, "エラー", "DSP1の測定項目が選択されていません。")
-                return []
-            dsp1_key, _, _, _ = self.measurement_options[idx]
-            commands.append(f"DSP1,{dsp1_key}")
-
-            if self.dsp1_range_group.buttons():
-                range_idx = self.dsp1_range_group.checkedId()
-                ranges = self.range_dict.get(dsp1_key, [])
-                if 0 <= range_idx < len(ranges):
-                    range_key, _ = ranges[range_idx]
-                    commands.append(f"DSP1,{range_key}")
-
-            idx = self.dsp2_option_group.checkedId()
-            if idx == -1:
-                commands.append("DE0")
-            else:
-                dsp2_key, _, _, _ = self.measurement_options[idx]
-                if dsp2_key == "DE0":
-                    commands.append("DE0")
-                else:
-                    commands.append(f"DSP2,{dsp2_key}")
-                    if self.dsp2_range_group.buttons():
-                        range_idx = self.dsp2_range_group.checkedId()
-                        ranges = self.range_dict.get(dsp2_key, [])
-                        if 0 <= range_idx < len(ranges):
-                            range_key, _ = ranges[range_idx]
-                            commands.append(f"DSP2,{range_key}")
-        else:
-            jig_mode_name = self.jig_selection_combo.currentText()
-            dsp1_key = None
-            dsp2_key = None
-            for jig_mode in self.jig_modes:
-                if jig_mode[0] == jig_mode_name:
-                    dsp1_key = jig_mode[1]
-                    dsp2_key = jig_mode[2]
-                    break
-
-            if dsp1_key and dsp1_key in self.range_dict:
-                commands.append(f"DSP1,{dsp1_key}")
-                ranges_dsp1 = self.range_dict.get(dsp1_key, [])
-                range_idx = self.dsp1_range_group.checkedId()
-                if 0 <= range_idx < len(ranges_dsp1):
-                    range_key, _ = ranges_dsp1[range_idx]
-                    commands.append(f"DSP1,{range_key}")
-            else:
-                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP1設定に誤りがあります。")
-                return []
-
-            if dsp2_key and dsp2_key in self.range_dict:
-                commands.append(f"DSP2,{dsp2_key}")
-                ranges_dsp2 = self.range_dict.get(dsp2_key, [])
-                range_idx = self.dsp2_range_group.checkedId()
-                if 0 <= range_idx < len(ranges_dsp2):
-                    range_key, _ = ranges_dsp2[range_idx]
-                    commands.append(f"DSP2,{range_key}")
-            else:
-                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP2設定に誤りがあります。")
-                return []
-
-        auto_zero_id = self.auto_zero_group.checkedId()
-        if auto_zero_id == 0:
-            commands.append("AZ0")
-        elif auto_zero_id == 1:
-            commands.append("AZ1")
-        elif auto_zero_id == 2:
-            commands.append("AZ2")
-
-        if self.trigger_radio1.isChecked():
-            commands.append("TRS0")
-        elif self.trigger_radio3.isChecked():
-            commands.append("TRS3")
-
-        if self.sampling_radio1.isChecked():
-            commands.append("PR1")
-        elif self.sampling_radio2.isChecked():
-            commands.append("PR2")
-        elif self.sampling_radio3.isChecked():
-            commands.append("PR3")
-        elif self.sampling_radio4.isChecked():
-            commands.append("PR4")
-
-        return commands
-
-    def get_trigger_mode(self):
-        if self.trigger_radio1.isChecked():
-            return "TRS0"
-        elif self.trigger_radio3.isChecked():
-            return "TRS3"
-
-    def get_measurement_modes(self):
-        mode_id = self.mode_group.checkedId()
-        if mode_id == 0:
-            idx = self.dsp1_option_group.checkedId()
-            if idx == -1:
-                dsp1_desc = ""
-                dsp1_prefix = ""
-                dsp1_unit = ""
-            else:
-                dsp1_desc = self.measurement_options[idx][1]
-                dsp1_prefix = self.measurement_options[idx][2]
-                dsp1_unit = self.measurement_options[idx][3]
-
-            idx = self.dsp2_option_group.checkedId()
-            if idx == -1:
-                dsp2_desc = None
-                dsp2_prefix = None
-                dsp2_unit = None
-            else:
-                dsp2_key, dsp2_desc, dsp2_prefix, dsp2_unit = self.measurement_options[idx]
-                if dsp2_key == "DE0":
-                    dsp2_desc = None
-                    dsp2_prefix = None
-                    dsp2_unit = None
-
-            return (dsp1_desc, dsp1_prefix, dsp1_unit), (dsp2_desc, dsp2_prefix, dsp2_unit)
-
-        else:
-            jig_mode_name = self.jig_selection_combo.currentText()
-            dsp1_desc = ""
-            dsp1_prefix = ""
-            dsp1_unit = ""
-            dsp2_desc = ""
-            dsp2_prefix = ""
-            dsp2_unit = ""
-            for jig_mode in self.jig_modes:
-                if jig_mode[0] == jig_mode_name:
-                    dsp1_key = jig_mode[1]
-                    dsp2_key = jig_mode[2]
-                    dsp1_idx = self.get_measurement_option_index(dsp1_key)
-                    dsp2_idx = self.get_measurement_option_index(dsp2_key)
-                    if dsp1_idx != -1:
-                        dsp1_desc = self.measurement_options[dsp1_idx][1]
-                        dsp1_prefix = self.measurement_options[dsp1_idx][2]
-                        dsp1_unit = self.measurement_options[dsp1_idx][3]
-                    else:
-                        QMessageBox.critical(self, "エラー",
-                                             f"ジグ測定モード '{jig_mode_name}' のDSP1キーが見つかりません。")
-                    if dsp2_idx != -1:
-                        dsp2_desc = self.measurement_options[dsp2_idx][1]
-                        dsp2_prefix = self.measurement_options[dsp2_idx][2]
-                        dsp2_unit = self.measurement_options[dsp2_idx][3]
-                    else:
-                        QMessageBox.critical(self, "エラー",
-                                             f"ジグ測定モード '{jig_mode_name}' のDSP2キーが見つかりません。")
-                    break
-            return (dsp1_desc, dsp1_prefix, dsp1_unit), (dsp2_desc, dsp2_prefix, dsp2_unit)
-
-    def get_measurement_option_index(self, key):
-        for idx, option in enumerate(self.measurement_options):
-            if option[0] == key:
-                return idx
-        return -1
-
-
-class ModeSelectionPage(QWidget):
-    def __init__(self):
-        super().__init__(parent=None)
-        layout = QVBoxLayout()
-        label = QLabel("モードを選択してください:")
-        layout.addWidget(label)
-
-        button_layout = QHBoxLayout()
-        self.value_display_button = QPushButton("値表示モード")
-        self.value_display_button.setFixedSize(200, 60)
-        self.graph_display_button = QPushButton("グラフ表示モード")
-        self.graph_display_button.setFixedSize(200, 60)
-        button_layout.addWidget(self.value_display_button)
-        button_layout.addWidget(self.graph_display_button)
-        layout.addLayout(button_layout)
-
-        self.reset_button = QPushButton("リセット")
-        self.reset_button.setFixedSize(100, 40)
-        layout.addWidget(self.reset_button, alignment=Qt.AlignRight)
-        self.setLayout(layout)
-
-
-class ValueDisplayPage(QWidget):
-    def __init__(self):
-        super().__init__(parent=None)
-        self.calculated_unit = None
-        layout = QVBoxLayout()
-        self.value_label_ach = QLabel("---")
-        self.value_label_bch = QLabel("---")
-        self.value_label_calculated = QLabel("---")
-
-        font = QFont()
-        font.setPointSize(72)
-        self.value_label_ach.setFont(font)
-        self.value_label_bch.setFont(font)
-        self.value_label_calculated.setFont(font)
-
-        self.value_label_ach.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.value_label_bch.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.value_label_calculated.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-
-        layout.addWidget(self.value_label_ach)
-        layout.addWidget(self.value_label_bch)
-        layout.addWidget(self.value_label_calculated)
-
-        button_layout = QHBoxLayout()
-        self.trigger_button = QPushButton("トリガー")
-        self.switch_display_button = QPushButton("表示切替")
-        self.reset_button = QPushButton("リセット")
-        button_layout.addWidget(self.trigger_button)
-        button_layout.addWidget(self.switch_display_button)
-        button_layout.addWidget(self.reset_button)
-        layout.addLayout(button_layout)
-
-        self.setLayout(layout)
-        self.ach_desc = ""
-        self.bch_desc = ""
-        self.calculated_value_desc = ""
-        self.jig_mode = False
-
-    def set_measurement_mode_descriptions(self, ach_desc, bch_desc, jig_mode=False,
-                                          calculated_value_desc="", calculated_unit=""):
-        self.ach_desc = ach_desc
-        self.bch_desc = bch_desc
-        self.jig_mode = jig_mode
-        self.calculated_value_desc = calculated_value_desc
-        self.calculated_unit = calculated_unit
-
-        if jig_mode:
-            self.value_label_ach.hide()
-            self.value_label_bch.hide()
-            self.value_label_calculated.setText(f"{self.calculated_value_desc}: --- {self.calculated_unit}")
-            self.value_label_calculated.show()
-        else:
-            self.value_label_calculated.hide()
-            self.value_label_ach.setText(f"{self.ach_desc}: ---")
-            if self.bch_desc:
-                self.value_label_bch.setText(f"{self.bch_desc}: ---")
-                self.value_label_bch.show()
-            else:
-                self.value_label_bch.hide()
-
-    def update_values(self, ach_value, bch_value, calculated_value=None,
-                      ach_unit="", bch_unit="", calculated_unit="", jig_mode=False):
-        self.jig_mode = jig_mode
-        if jig_mode:
-            # 修正箇所: float('inf') をチェックに追加
-            if calculated_value == 'Overload' or calculated_value is None or math.isnan(calculated_value) or math.isinf(calculated_value):
-                calculated_text = f"{self.calculated_value_desc}: Overload"
-            else:
-                if calculated_unit:
-                    formatted_value = format_si_unit(calculated_value, calculated_unit)
-                else:
-                    formatted_value = f"{calculated_value:.3f}"
-                calculated_text = f"{self.calculated_value_desc}: {formatted_value}"
-            self.value_label_calculated.setText(calculated_text)
-        else:
-            if ach_value == 'Overload' or math.isnan(ach_value):
-                ach_text = f"{self.ach_desc}: Overload"
-            else:
-                formatted_value = format_si_unit(ach_value, ach_unit)
-                ach_text = f"{self.ach_desc}: {formatted_value}"
-            self.value_label_ach.setText(ach_text)
-
-            if self.bch_desc:
-                if bch_value == 'Overload' or math.isnan(bch_value):
-                    bch_text = f"{self.bch_desc}: Overload"
-                else:
-                    formatted_value = format_si_unit(bch_value, bch_unit)
-                    bch_text = f"{self.bch_desc}: {formatted_value}"
-                self.value_label_bch.setText(bch_text)
-                self.value_label_bch.show()
-            else:
-                self.value_label_bch.hide()
-
-            self.value_label_calculated.hide()
-
-
-class GraphDisplayPage(QWidget):
-    def __init__(self):
-        super().__init__(parent=None)
-        self.bch_desc = None
-        self.ach_desc = None
-        self.line_bch = None
-        self.line_ach = None
-        self.line_calculated = None
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
-        self.ax_ach = None
-        self.ax_bch = None
-        self.ax_calculated = None
-
-        self.value_label_ach = QLabel("---")
-        self.value_label_bch = QLabel("---")
-        self.value_label_calculated = QLabel("---")
-
-        font = QFont()
-        font.setPointSize(24)
-        self.value_label_ach.setFont(font)
-        self.value_label_bch.setFont(font)
-        self.value_label_calculated.setFont(font)
-
-        self.value_label_ach.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.value_label_bch.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-        self.value_label_calculated.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-
-        main_layout = QVBoxLayout()
-        main_layout.setContentsMargins(5, 5, 5, 5)
-        main_layout.setSpacing(5)
-
-        labels_layout = QHBoxLayout()
-        labels_layout.setContentsMargins(0, 0, 0, 0)
-        labels_layout.setSpacing(10)
-        self.value_label_ach.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-        self.value_label_bch.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-        self.value_label_calculated.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-
-        labels_layout.addWidget(self.value_label_ach, alignment=Qt.AlignLeft)
-        labels_layout.addStretch(1)
-        labels_layout.addWidget(self.value_label_bch, alignment=Qt.AlignCenter)
-        labels_layout.addStretch(1)
-        labels_layout.addWidget(self.value_label_calculated, alignment=Qt.AlignRight)
-        main_layout.addLayout(labels_layout)
-
-        self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        main_layout.addWidget(self.canvas, stretch=1)
-
-        time_setting_layout = QHBoxLayout()
-        time_setting_layout.setContentsMargins(0, 0, 0, 0)
-        time_setting_layout.setSpacing(5)
-        time_label = QLabel("時間軸の最大表示量（秒）:")
-        self.time_input = QLineEdit("10")
-        self.time_input.setFixedWidth(80)
-        time_setting_layout.addWidget(time_label)
-        time_setting_layout.addWidget(self.time_input)
-        time_setting_layout.addStretch()
-        main_layout.addLayout(time_setting_layout)
-
-        button_layout = QHBoxLayout()
-        button_layout.setContentsMargins(0, 0, 0, 0)
-        button_layout.setSpacing(5)
-
-        self.trigger_button = QPushButton("トリガー")
-        self.switch_display_button = QPushButton("表示切替")
-        self.recording_button = QPushButton("記録開始")
-        self.reset_graph_button = QPushButton("グラフリセット")
-        self.reset_button = QPushButton("リセット")
-
-        button_layout.addWidget(self.trigger_button)
-        button_layout.addWidget(self.switch_display_button)
-        button_layout.addWidget(self.recording_button)
-        button_layout.addWidget(self.reset_graph_button)
-        button_layout.addWidget(self.reset_button)
-        button_layout.addStretch()
-
-        main_layout.addLayout(button_layout)
-        self.setLayout(main_layout)
-
-        self.ach_data = []
-        self.bch_data = []
-        self.calculated_data = []
-        self.time_data = []
-        self.start_time = time.time()
-        self.ach_unit = ""
-        self.bch_unit = ""
-        self.calculated_unit = ""
-        self.calculated_value_desc = ""
-        self.jig_mode = False
-
-        self.recording = False
-        self.recorded_data = []
-
-        self.recording_button.clicked.connect(self.toggle_recording)
-        self.reset_graph_button.clicked.connect(self.reset_graph)
-
-    def load_data_from_list(self, data_list, jig_mode, jig_mode_name, measurement_mode_bch):
-        ach_values = []
-        bch_values = []
-        calculated_values = []
-        time_values = []
-
-        for timestamp, ach_value, bch_value in data_list:
-            time_values.append(timestamp)
-            if jig_mode:
-                if jig_mode_name in ("四端子抵抗測定A_V", "四端子抵抗測定B_V"):
-                    if ach_value != 0 and not math.isnan(ach_value) and not math.isnan(bch_value):
-                        calculated_value = abs(ach_value / bch_value)
-                    else:
-                        calculated_value = float('inf')  # 修正: 割り切れない場合はinf
-                elif jig_mode_name == "hFE測定":
-                    if ach_value != 0 and not math.isnan(ach_value) and not math.isnan(bch_value):
-                        calculated_value = bch_value / ach_value
-                    else:
-                        calculated_value = float('inf')  # 修正
-                elif jig_mode_name == "電力計測(小電流)":
-                    if not math.isnan(ach_value) and not math.isnan(bch_value):
-                        calculated_value = ach_value * bch_value
-                    else:
-                        calculated_value = float('inf')  # 修正
-                elif jig_mode_name == "電力計測(大電流)":
-                    if not math.isnan(ach_value) and not math.isnan(bch_value):
-                        calculated_value = ach_value * bch_value
-                    else:
-                        calculated_value = float('inf')  # 修正
-                else:
-                    calculated_value = float('inf')  # 修正
-                calculated_values.append(calculated_value)
-            else:
-                ach_values.append(ach_value)
-                if measurement_mode_bch:
-                    bch_values.append(bch_value)
-
-        if jig_mode and calculated_values:
-            self.update_graph(
-                ach_values=[],
-                bch_values=[],
-                time_values=time_values,
-                calculated_values=calculated_values
-            )
-        elif ach_values:
-            self.update_graph(
-                ach_values=ach_values,
-                bch_values=bch_values if bch_values else None,
-                time_values=time_values
-            )
-
-    def set_measurement_mode_descriptions(self, ach_desc, bch_desc, jig_mode=False,
-                                          calculated_value_desc="", calculated_unit=""):
-        self.ach_desc = ach_desc
-        self.bch_desc = bch_desc
-        self.jig_mode = jig_mode
-        self.calculated_value_desc = calculated_value_desc
-        self.calculated_unit = calculated_unit
-
-        self.figure.clf()
-        try:
-            max_display_time = float(self.time_input.text())
-        except ValueError:
-            max_display_time = 10
-
-        if self.jig_mode:
-            self.ax_calculated = self.figure.add_subplot(1, 1, 1)
-            self.ax_calculated.set_title(self.calculated_value_desc)
-            self.line_calculated, = self.ax_calculated.plot([], [], color='red', linewidth=2)
-            self.ax_calculated.grid(True, linestyle='--', color='gray', linewidth=0.5)
-            self.ax_calculated.set_xlim(0, max_display_time)
-            self.ax_calculated.set_xlabel("時間 (秒)")
-            self.ax_calculated.set_ylabel(f"{self.calculated_value_desc} ({self.calculated_unit})")
-            self.ax_calculated.ticklabel_format(useOffset=False, style='plain')
-        else:
-            if self.bch_desc:
-                self.ax_ach = self.figure.add_subplot(2, 1, 1)
-                self.ax_bch = self.figure.add_subplot(2, 1, 2)
-                self.ax_ach.set_title(self.ach_desc)
-                self.ax_bch.set_title(self.bch_desc)
-                self.line_ach, = self.ax_ach.plot([], [], color='green', linewidth=2)
-                self.line_bch, = self.ax_bch.plot([], [], color='blue', linewidth=2)
-                self.ax_ach.grid(True, linestyle='--', color='gray', linewidth=0.5)
-                self.ax_bch.grid(True, linestyle='--', color='gray', linewidth=0.5)
-                self.ax_ach.set_xlim(0, max_display_time)
-                self.ax_bch.set_xlim(0, max_display_time)
-                self.ax_ach.set_xlabel("時間 (秒)")
-                self.ax_ach.set_ylabel(f"{self.ach_desc} ({self.ach_unit})")
-                self.ax_bch.set_xlabel("時間 (秒)")
-                self.ax_bch.set_ylabel(f"{self.bch_desc} ({self.bch_unit})")
-                self.ax_ach.ticklabel_format(useOffset=False, style='plain')
-                self.ax_bch.ticklabel_format(useOffset=False, style='plain')
-            else:
-                self.ax_ach = self.figure.add_subplot(1, 1, 1)
-                self.ax_ach.set_title(self.ach_desc)
-                self.line_ach, = self.ax_ach.plot([], [], color='green', linewidth=2)
-                self.ax_ach.grid(True, linestyle='--', color='gray', linewidth=0.5)
-                self.ax_ach.set_xlim(0, max_display_time)
-                self.ax_ach.set_xlabel("時間 (秒)")
-                self.ax_ach.set_ylabel(f"{self.ach_desc} ({self.ach_unit})")
-                self.ax_ach.ticklabel_format(useOffset=False, style='plain')
-
-        self.figure.tight_layout()
-
-    def update_graph(self, ach_values, bch_values, time_values, calculated_values=None):
-        # 先にtime_dataにextend
-        self.time_data.extend(time_values)
-
-        # 空なら描画せずreturn
-        if not self.time_data:
-            self.canvas.draw()
-            return
-
-        if self.jig_mode and calculated_values:
-            # 修正: float('inf') をフィルタリング
-            filtered_time = []
-            filtered_calculated = []
-            for t, c in zip(time_values, calculated_values):
-                if not math.isinf(c):
-                    filtered_time.append(t)
-                    filtered_calculated.append(c)
-            self.calculated_data.extend(filtered_calculated)
-            time_values = filtered_time
-        else:
-            self.ach_data.extend(ach_values)
-            if self.bch_desc and bch_values:
-                self.bch_data.extend(bch_values)
-
-        try:
-            max_display_time = float(self.time_input.text())
-        except ValueError:
-            max_display_time = 10
-
-        if max_display_time > 0:
-            min_time = max(0, self.time_data[-1] - max_display_time)
-            max_time = self.time_data[-1]
-        else:
-            min_time = min(self.time_data)
-            max_time = max(self.time_data)
-
-        # フィルタリングしたデータのみを保持
-        if self.jig_mode and calculated_values:
-            indices = [i for i, t in enumerate(self.time_data) if min_time <= t <= max_time]
-            self.time_data = [self.time_data[i] for i in indices]
-            self.calculated_data = [self.calculated_data[i] for i in indices]
-            time_data = [self.time_data[i] for i in indices]
-            calculated_data = [self.calculated_data[i] for i in indices]
-        else:
-            indices = [i for i, t in enumerate(self.time_data) if min_time <= t <= max_time]
-            self.time_data = [self.time_data[i] for i in indices]
-            self.ach_data = [self.ach_data[i] for i in indices]
-            if self.bch_desc and bch_values:
-                self.bch_data = [self.bch_data[i] for i in indices]
-            time_data = [self.time_data[i] for i in indices]
-            ach_data = [self.ach_data[i] for i in indices]
-            if self.bch_desc and bch_values:
-                bch_data = [self.bch_data[i] for i in indices]
-
-        if self.jig_mode and calculated_values:
-            self.line_calculated.set_data(time_data, calculated_data)
-            self.ax_calculated.set_xlim(min_time, max_time)
-            self.ax_calculated.relim()
-            self.ax_calculated.autoscale_view()
-
-            y_min, y_max = self.ax_calculated.get_ylim()
-            y_range = y_max - y_min if (y_max - y_min) != 0 else 1
-            y_major_interval = y_range / 10
-            self.ax_calculated.yaxis.set_major_locator(MultipleLocator(y_major_interval))
-            self.ax_calculated.yaxis.set_minor_locator(MultipleLocator(y_major_interval / 5))
-
-            x_range = max_time - min_time if (max_time - min_time) != 0 else 1
-            x_major_interval = x_range / 10
-            self.ax_calculated.xaxis.set_major_locator(MultipleLocator(x_major_interval))
-            self.ax_calculated.xaxis.set_minor_locator(MultipleLocator(x_major_interval / 5))
-            self.ax_calculated.grid(True, which='both', linestyle='--', color='gray', linewidth=0.5)
-        else:
-            if self.bch_desc:
-                self.line_ach.set_data(time_data, ach_data)
-                self.line_bch.set_data(time_data, bch_data)
-                self.ax_ach.set_xlim(min_time, max_time)
-                self.ax_bch.set_xlim(min_time, max_time)
-                self.ax_ach.relim()
-                self.ax_ach.autoscale_view()
-                self.ax_bch.relim()
-                self.ax_bch.autoscale_view()
-
-                y_min, y_max = self.ax_ach.get_ylim()
-                y_range = y_max - y_min if (y_max - y_min) != 0 else 1
-                y_major_interval = y_range / 10
-                self.ax_ach.yaxis.set_major_locator(MultipleLocator(y_major_interval))
-                self.ax_ach.yaxis.set_minor_locator(MultipleLocator(y_major_interval / 5))
-
-                y_min, y_max = self.ax_bch.get_ylim()
-                y_range = y_max - y_min if (y_max - y_min) != 0 else 1
-                y_major_interval = y_range / 10
-                self.ax_bch.yaxis.set_major_locator(MultipleLocator(y_major_interval))
-                self.ax_bch.yaxis.set_minor_locator(MultipleLocator(y_major_interval / 5))
-
-                x_range = max_time - min_time if (max_time - min_time) != 0 else 1
-                x_major_interval = x_range / 10
-                self.ax_ach.xaxis.set_major_locator(MultipleLocator(x_major_interval))
-                self.ax_ach.xaxis.set_minor_locator(MultipleLocator(x_major_interval / 5))
-                self.ax_bch.xaxis.set_major_locator(MultipleLocator(x_major_interval))
-                self.ax_bch.xaxis.set_minor_locator(MultipleLocator(x_major_interval / 5))
-                self.ax_ach.grid(True, which='both', linestyle='--', color='gray', linewidth=0.5)
-                self.ax_bch.grid(True, which='both', linestyle='--', color='gray', linewidth=0.5)
-            else:
-                self.line_ach.set_data(time_data, ach_data)
-                self.ax_ach.set_xlim(min_time, max_time)
-                self.ax_ach.relim()
-                self.ax_ach.autoscale_view()
-
-                y_min, y_max = self.ax_ach.get_ylim()
-                y_range = y_max - y_min if (y_max - y_min) != 0 else 1
-                y_major_interval = y_range / 10
-                self.ax_ach.yaxis.set_major_locator(MultipleLocator(y_major_interval))
-                self.ax_ach.yaxis.set_minor_locator(MultipleLocator(y_major_interval / 5))
-
-                x_range = max_time - min_time if (max_time - min_time) != 0 else 1
-                x_major_interval = x_range / 10
-                self.ax_ach.xaxis.set_major_locator(MultipleLocator(x_major_interval))
-                self.ax_ach.xaxis.set_minor_locator(MultipleLocator(x_major_interval / 5))
-                self.ax_ach.grid(True, which='both', linestyle='--', color='gray', linewidth=0.5)
-
-        self.canvas.draw()
-
-        # ラベル表示
-        if self.jig_mode and calculated_values:
-            latest_value = calculated_values[-1] if calculated_values else float('inf')
-            if latest_value == 'Overload' or latest_value is None or math.isnan(latest_value) or math.isinf(latest_value):
-                calculated_text = f"{self.calculated_value_desc}: Overload"
-            else:
-                if self.calculated_unit:
-                    formatted_value = format_si_unit(latest_value, self.calculated_unit)
-                else:
-                    formatted_value = f"{latest_value:.3f}"
-                calculated_text = f"{self.calculated_value_desc}: {formatted_value}"
-            self.value_label_calculated.setText(calculated_text)
-        else:
-            if ach_values:
-                latest_ach_value = ach_values[-1]
-                if latest_ach_value == 'Overload' or math.isnan(latest_ach_value):
-                    ach_text = f"{self.ach_desc}: Overload"
-                else:
-                    formatted_value = format_si_unit(latest_ach_value, self.ach_unit)
-                    ach_text = f"{self.ach_desc}: {formatted_value}"
-                self.value_label_ach.setText(ach_text)
-            if self.bch_desc and bch_values:
-                latest_bch_value = bch_values[-1]
-                if latest_bch_value == 'Overload' or math.isnan(latest_bch_value):
-                    bch_text = f"{self.bch_desc}: Overload"
-                else:
-                    formatted_value = format_si_unit(latest_bch_value, self.bch_unit)
-                    bch_text = f"{self.bch_desc}: {formatted_value}"
-                self.value_label_bch.setText(bch_text)
-
-        if self.recording:
-            if self.jig_mode and calculated_values:
-                for t, c_val in zip(time_values, calculated_values):
-                    if not math.isinf(c_val):
-                        self.recorded_data.append([t, c_val])
-            else:
-                # bch_values or [None]*len(ach_values) -- 安全にzipする
-                combined_b = bch_values if bch_values else [None] * len(ach_values)
-                for t, a_val, b_val in zip(time_values, ach_values, combined_b):
-                    if self.bch_desc:
-                        self.recorded_data.append([t, a_val, b_val])
-                    else:
-                        self.recorded_data.append([t, a_val])
-
-    def toggle_recording(self):
-        if not self.recording:
-            self.recording = True
-            self.recorded_data = []
-            self.recording_button.setText("記録停止")
-        else:
-            self.recording = False
-            self.recording_button.setText("記録開始")
-            self.save_recorded_data()
-
-    def save_recorded_data(self):
-        if not self.recorded_data:
-            QMessageBox.information(self, "情報", "記録されたデータがありません。")
-            return
-
-        options = QFileDialog.Options()
-        options |= QFileDialog.DontUseNativeDialog
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "CSVファイルに保存", "", "CSV Files (*.csv);;All Files (*)", options=options
-        )
-        if file_path:
-            try:
-                with open(file_path, mode='w', newline='') as file:
-                    writer = csv.writer(file)
-                    if self.jig_mode:
-                        writer.writerow(["時間 (秒)", f"{self.calculated_value_desc} ({self.calculated_unit})"])
-                        writer.writerows(self.recorded_data)
-                    else:
-                        if self.bch_desc:
-                            writer.writerow(["時間 (秒)",
-                                             f"{self.ach_desc} ({self.ach_unit})",
-                                             f"{self.bch_desc} ({self.bch_unit})"])
-                            writer.writerows(self.recorded_data)
-                        else:
-                            writer.writerow(["時間 (秒)", f"{self.ach_desc} ({self.ach_unit})"])
-                            for row in self.recorded_data:
-                                writer.writerow(row)
-                QMessageBox.information(self, "成功", f"データを{file_path}に保存しました。")
-            except Exception as e:
-                QMessageBox.critical(self, "エラー", f"データの保存に失敗しました。\n{e}")
-
-    def reset_graph(self):
-        self.time_input.setText("10")
-        self.ach_data.clear()
-        self.bch_data.clear()
-        self.calculated_data.clear()
-        self.time_data.clear()
-        self.start_time = time.time()
-        self.figure.clf()
-        self.set_measurement_mode_descriptions(
-            self.ach_desc,
-            self.bch_desc,
-            self.jig_mode,
-            self.calculated_value_desc,
-            self.calculated_unit
-        )
-        self.canvas.draw()
-        self.recorded_data.clear()
-
-
-class DMMApp(QMainWindow):
-    def __init__(self):
-        super().__init__(parent=None)
-        self.is_ready_event = None
-        self.setup_timer = None
-        self.setup_dialog = None
-        self.rm = rm
-        self.resources = self.rm.list_resources()
-        self.selected_resource = None
-        self.trigger_mode = None
-        self.measurement_mode_ach = None
-        self.measurement_mode_bch = None
-        self.ach_unit = ""
-        self.bch_unit = ""
-        self.jig_mode = False
-        self.jig_mode_name = None
-        self.calculated_value_desc = ""
-        self.calculated_unit = ""
-
-        self.jig_modes = [
-            ("四端子抵抗測定A_V", "F1", "F35"),
-            ("四端子抵抗測定B_V", "F12", "F5"),
-            ("hFE測定", "F5", "F35"),
-            ("電力計測(小電流)", "F5", "F12"),
-            ("電力計測(大電流)", "F1", "F35"),
-        ]
-
-        self.setWindowTitle("7352A/E コントローラー")
-        self.setGeometry(100, 100, 1920, 1080)
-        font = QFont()
-        font.setPointSize(14)
-        self.setFont(font)
-
-        self.stacked_widget = QStackedWidget(parent=None)
-        self.setCentralWidget(self.stacked_widget)
-
-        self.device_selection_page = DeviceSelectionPage(self.resources)
-        self.dmm_setup_page = DMMSetupPage(self.jig_modes)
-        self.mode_selection_page = ModeSelectionPage()
-        self.value_display_page = ValueDisplayPage()
-        self.graph_display_page = GraphDisplayPage()
-
-        self.stacked_widget.addWidget(self.device_selection_page)
-        self.stacked_widget.addWidget(self.dmm_setup_page)
-        self.stacked_widget.addWidget(self.mode_selection_page)
-        self.stacked_widget.addWidget(self.value_display_page)
-        self.stacked_widget.addWidget(self.graph_display_page)
-
-        self.device_selection_page.next_button.clicked.connect(self.go_to_dmm_setup)
-        self.dmm_setup_page.next_button.clicked.connect(self.go_to_mode_selection)
-        self.mode_selection_page.value_display_button.clicked.connect(self.go_to_value_display)
-        self.mode_selection_page.graph_display_button.clicked.connect(self.go_to_graph_display)
-        self.value_display_page.switch_display_button.clicked.connect(self.switch_display_mode)
-        self.graph_display_page.switch_display_button.clicked.connect(self.switch_display_mode)
-        self.value_display_page.trigger_button.clicked.connect(self.send_trigger)
-        self.graph_display_page.trigger_button.clicked.connect(self.send_trigger)
-
-        self.mode_selection_page.reset_button.clicked.connect(self.reset_application)
-        self.value_display_page.reset_button.clicked.connect(self.reset_application)
-        self.graph_display_page.reset_button.clicked.connect(self.reset_application)
-
-        self.stacked_widget.setCurrentWidget(self.device_selection_page)
-
-        self.manager = Manager()
-        self.command_queue = self.manager.Queue()
-        self.data_list = self.manager.list()
-        self.measurement_process = None
-        self.stop_event = Event()
-        self.timer = None
-        self.last_read_index = 0
-
-    def switch_display_mode(self):
-        self.stacked_widget.setCurrentWidget(self.mode_selection_page)
-
-    def go_to_dmm_setup(self):
-        self.selected_resource = self.device_selection_page.combo.currentText()
-        if not self.selected_resource:
-            QMessageBox.warning(self, "警告", "機器を選択してください。")
-            return
-        self.stacked_widget.setCurrentWidget(self.dmm_setup_page)
-
-    def go_to_mode_selection(self):
-        commands = self.dmm_setup_page.get_setup_commands()
-        if not commands:
-            return
-        self.trigger_mode = self.dmm_setup_page.get_trigger_mode()
-        (self.measurement_mode_ach_desc, self.measurement_mode_ach, self.ach_unit), \
-            (self.measurement_mode_bch_desc, self.measurement_mode_bch, self.bch_unit) = \
-            self.dmm_setup_page.get_measurement_modes()
-
-        mode_id = self.dmm_setup_page.mode_group.checkedId()
-        self.jig_mode = (mode_id == 1)
-        if self.jig_mode:
-            self.jig_mode_name = self.dmm_setup_page.jig_selection_combo.currentText()
-            if self.jig_mode_name in ("四端子抵抗測定A_V", "四端子抵抗測定B_V"):
-                self.calculated_value_desc = "抵抗値"
-                self.calculated_unit = "Ω"
-            elif self.jig_mode_name == "hFE測定":
-                self.calculated_value_desc = "hFE"
-                self.calculated_unit = ""
-            elif self.jig_mode_name in ("電力計測(小電流)", "電力計測(大電流)"):
-                self.calculated_value_desc = "電力"
-                self.calculated_unit = "W"
-            else:
-                self.calculated_value_desc = ""
-                self.calculated_unit = ""
-        else:
-            self.jig_mode_name = None
-            self.calculated_value_desc = ""
-            self.calculated_unit = ""
-
-        self.value_display_page.set_measurement_mode_descriptions(
-            self.measurement_mode_ach_desc,
-            self.measurement_mode_bch_desc,
-            self.jig_mode,
-            calculated_value_desc=self.calculated_value_desc,
-            calculated_unit=self.calculated_unit
-        )
-        self.graph_display_page.set_measurement_mode_descriptions(
-            self.measurement_mode_ach_desc,
-            self.measurement_mode_bch_desc,
-            self.jig_mode,
-            calculated_value_desc=self.calculated_value_desc,
-            calculated_unit=self.calculated_unit
-        )
-
-        self.start_measurement(commands)
-
-        self.setup_dialog = QDialog(self)
-        self.setup_dialog.setWindowTitle("DMMセットアップ中")
-        layout = QVBoxLayout()
-        label = QLabel("DMMセットアップ中... お待ちください。")
-        layout.addWidget(label)
-        self.setup_dialog.setLayout(layout)
-        self.setup_dialog.setModal(True)
-
-        self.setup_timer = QTimer(self.setup_dialog)
-        self.setup_timer.timeout.connect(self.check_dmm_ready)
-        self.setup_timer.start(100)
-
-        self.setup_dialog.show()
-        self.stacked_widget.setCurrentWidget(self.mode_selection_page)
-
-    def check_dmm_ready(self):
-        if self.is_ready_event.is_set():
-            self.setup_timer.stop()
-            self.setup_dialog.accept()
-            self.stacked_widget.setCurrentWidget(self.mode_selection_page)
-
-    def start_measurement(self, setup_commands):
-        if self.measurement_process and self.measurement_process.is_alive():
-            self.stop_measurement()
-        self.stop_event.clear()
-
-        self.is_ready_event = Event()
-        self.measurement_process = MeasurementClass(
-            self.command_queue,
-            self.data_list,
-            self.selected_resource,
-            self.stop_event,
-            self.is_ready_event
-        )
-        self.measurement_process.start()
-
-        self.command_queue.put("SEND *RST")
-        for cmd in setup_commands:
-            self.command_queue.put(f"SEND {cmd}")
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_from_shared_memory)
-        self.timer.start(20)
-
-    def go_to_value_display(self):
-        self.stacked_widget.setCurrentWidget(self.value_display_page)
-        if self.trigger_mode == "TRS3":
-            self.value_display_page.trigger_button.setEnabled(True)
-        else:
-            self.value_display_page.trigger_button.setEnabled(False)
-
-    def go_to_graph_display(self):
-        self.stacked_widget.setCurrentWidget(self.graph_display_page)
-        if self.trigger_mode == "TRS3":
-            self.graph_display_page.trigger_button.setEnabled(True)
-        else:
-            self.graph_display_page.trigger_button.setEnabled(False)
-
-        self.graph_display_page.load_data_from_list(
-            self.data_list, self.jig_mode, self.jig_mode_name, self.measurement_mode_bch
-        )
-
-    def update_from_shared_memory(self):
-        ach_values = []
-        bch_values = []
-        calculated_values = []
-        time_values = []
-
-        new_data_count = len(self.data_list) - self.last_read_index
-        if new_data_count <= 0:
-            return
-
-        data_slice = self.data_list[self.last_read_index:]
-        self.last_read_index += new_data_count
-
-        for timestamp, ach_value, bch_value in data_slice:
-            time_values.append(timestamp)
-
-            if self.jig_mode:
-                if self.jig_mode_name == "四端子抵抗測定A_V":
-                    if ach_value != 0 and not math.isnan(ach_value) and not math.isnan(bch_value):
-                        try:
-                            calculated_value = abs(ach_value / bch_value)
-                        except ZeroDivisionError:
-                            calculated_value = float('inf')  # 修正: 割り切れない場合はinf
-                    else:
-                        calculated_value = float('inf')  # 修正
-                elif self.jig_mode_name == "四端子抵抗測定B_V":
-                    if ach_value != 0 and not math.isnan(ach_value) and not math.isnan(bch_value):
-                        try:
-                            calculated_value = abs(ach_value / bch_value)
-                        except ZeroDivisionError:
-                            calculated_value = float('inf')  # 修正
-                    else:
-                        calculated_value = float('inf')  # 修正
-                elif self.jig_mode_name == "hFE測定":
-                    if ach_value != 0 and not math.isnan(ach_value) and not math.isnan(bch_value):
-                        try:
-                            calculated_value = bch_value / ach_value
-                        except ZeroDivisionError:
-                            calculated_value = float('inf')  # 修正
-                    else:
-                        calculated_value = float('inf')  # 修正
-                elif self.jig_mode_name == "電力計測(小電流)":
-                    if not math.isnan(ach_value) and not math.isnan(bch_value):
-                        calculated_value = ach_value * bch_value
-                    else:
-                        calculated_value = float('inf')  # 修正
-                elif self.jig_mode_name == "電力計測(大電流)":
-                    if not math.isnan(ach_value) and not math.isnan(bch_value):
-                        calculated_value = ach_value * bch_value
-                    else:
-                        calculated_value = float('inf')  # 修正
-                else:
-                    calculated_value = float('inf')  # 修正
-                calculated_values.append(calculated_value)
-            else:
-                ach_values.append(ach_value)
-                if self.measurement_mode_bch:
-                    bch_values.append(bch_value)
-
-        # 値表示
-        if self.stacked_widget.currentWidget() == self.value_display_page:
-            if self.jig_mode:
-                if calculated_values:
-                    latest_calculated = calculated_values[-1]
-                    self.value_display_page.update_values(
-                        ach_value=None,
-                        bch_value=None,
-                        calculated_value=latest_calculated,
-                        ach_unit=self.ach_unit,
-                        bch_unit=self.bch_unit,
-                        calculated_unit=self.calculated_unit,
-                        jig_mode=self.jig_mode
-                    )
-            else:
-                if ach_values:
-                    latest_ach = ach_values[-1]
-                    latest_bch = bch_values[-1] if bch_values else None
-                    self.value_display_page.update_values(
-                        ach_value=latest_ach,
-                        bch_value=latest_bch,
-                        calculated_value=None,
-                        ach_unit=self.ach_unit,
-                        bch_unit=self.bch_unit,
-                        jig_mode=self.jig_mode
-                    )
-
-        # グラフ表示
-        if self.stacked_widget.currentWidget() == self.graph_display_page:
-            if self.jig_mode and calculated_values:
-                self.graph_display_page.update_graph(
-                    ach_values=[],
-                    bch_values=[],
-                    time_values=time_values,
-                    calculated_values=calculated_values
-                )
-            elif ach_values:
-                self.graph_display_page.update_graph(
-                    ach_values=ach_values,
-                    bch_values=bch_values if bch_values else None,
-                    time_values=time_values
-                )
-
-    def stop_measurement(self):
-        if self.measurement_process and self.measurement_process.is_alive():
-            self.command_queue.put("STOP")
-            self.measurement_process.join()
-            self.measurement_process = None
-        if self.timer and self.timer.isActive():
-            self.timer.stop()
-        self.stacked_widget.setCurrentWidget(self.mode_selection_page)
-
-    def send_trigger(self):
-        if self.trigger_mode == "TRS3":
-            self.command_queue.put("TRIGGER")
-
-    def reset_application(self):
-        if self.measurement_process and self.measurement_process.is_alive():
-            self.command_queue.put("STOP")
-            self.measurement_process.join()
-            self.measurement_process = None
-        self.selected_resource = None
-        self.trigger_mode = None
-        self.measurement_mode_ach = None
-        self.measurement_mode_bch = None
-        self.ach_unit = ""
-        self.bch_unit = ""
-        self.jig_mode = False
-        self.jig_mode_name = None
-        self.calculated_value_desc = ""
-        self.calculated_unit = ""
-
-        self.graph_display_page.reset_graph()
-        self.value_display_page.set_measurement_mode_descriptions("", "", self.jig_mode)
-        self.stacked_widget.setCurrentWidget(self.device_selection_page)
-
-    def closeEvent(self, event, *args, **kwargs):
-        if self.measurement_process and self.measurement_process.is_alive():
-            self.command_queue.put("STOP")
-            self.measurement_process.join()
-        event.accept()
-
-
-def main():
-    app = QApplication(sys.argv)
-    font = QFont()
-    font.setPointSize(14)
-    app.setFont(font, "QLabel")
-
-    window = DMMApp()
-    window.show()
-    sys.exit(app.exec_())
-
-
-if __name__ == "__main__":
-    main()
+import sys
+import re
+import time
+import csv
+import queue
+import bisect
+import pyvisa
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QComboBox, QMessageBox, QMainWindow, QStackedWidget, QRadioButton, QButtonGroup,
+    QGridLayout, QScrollArea, QLineEdit, QFileDialog, QGroupBox, QSizePolicy, QDialog
+)
+from PyQt5.QtCore import QSignalBlocker, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QFont
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from matplotlib.ticker import MultipleLocator
+import matplotlib
+import matplotlib.font_manager as font_manager
+import numpy as np
+import math
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+
+
+@functools.lru_cache(maxsize=1)
+def _set_japanese_font():
+    # 利用可能なフォントから日本語フォントを探す (初回のグラフ構築時に一度だけ実行)
+    available_fonts = [f.name for f in font_manager.fontManager.ttflist]
+    japanese_fonts = [name for name in available_fonts if
+                      any(word in name for word in ['Yu Gothic', 'Meiryo', 'MS Gothic', 'Noto Sans CJK JP'])]
+
+    if japanese_fonts:
+        matplotlib.rcParams['font.family'] = japanese_fonts
+    else:
+        matplotlib.rcParams['font.family'] = ['sans-serif']
+
+
+rm = pyvisa.ResourceManager()
+
+# ホットパス用: NaNと±infを1回の呼び出しで判定する
+_isfinite = math.isfinite
+_isnan = math.isnan
+
+# 測定値の "<ヘッダ>_ <値>" / "<ヘッダ>O <値>" (オーバーロード) を1パスで抽出する
+# 値フィールドはここでは形を限定せず、数値への変換は読み出し側で行う
+_MEAS_RE = re.compile(rb'([A-Z0-9]*)([_O])\s+([^\s,]+)')
+
+
+# SIプレフィックスの境界・スケールを事前計算しておく
+_SI_BOUNDS = [1e-9, 1e-6, 1e-3, 1e0, 1e3, 1e6, 1e9]
+_SI_PREFIXES = ['n', 'μ', 'm', '', 'k', 'M', 'G']
+_SI_SCALES = [1e9, 1e6, 1e3, 1e0, 1e-3, 1e-6, 1e-9]
+
+
+def format_si_unit(value, unit='Ω'):
+    if value == 'Overload' or value is None or value != value:
+        return "Overload"
+
+    if value == 0:
+        idx = 3
+    else:
+        idx = bisect.bisect_right(_SI_BOUNDS, abs(value)) - 1
+        idx = max(0, min(idx, len(_SI_BOUNDS) - 1))
+
+    return f"{value * _SI_SCALES[idx]:.6g} {_SI_PREFIXES[idx]}{unit}"
+
+
+@functools.lru_cache(maxsize=2048)
+def _fmt_si_cached(value, unit):
+    # 安定した読み値は同じ(値, 単位)の組が続くため、整形結果をキャッシュする
+    return format_si_unit(value, unit)
+
+
+# よく使うアラインメントの組み合わせ (毎回ORを評価しないよう事前計算)
+_ALIGN_LEFT = Qt.AlignLeft | Qt.AlignVCenter
+_ALIGN_CENTER = Qt.AlignCenter | Qt.AlignVCenter
+_ALIGN_RIGHT = Qt.AlignRight | Qt.AlignVCenter
+
+
+@functools.lru_cache(maxsize=None)
+def _point_font(size):
+    # 同じポイントサイズのQFontを共有する (QApplication生成後に呼ぶこと)
+    font = QFont()
+    font.setPointSize(size)
+    return font
+
+
+# ジグモード名 -> 計算式ID (_jig_calc に渡す)
+_JIG_MODE_IDS = {
+    "四端子抵抗測定A_V": 0,
+    "四端子抵抗測定B_V": 0,
+    "hFE測定": 1,
+    "電力計測(小電流)": 2,
+    "電力計測(大電流)": 2,
+}
+
+
+def _jig_calc(mode_id, a, b):
+    # ジグモードの計算値を一括計算する。無効なサンプルはinfになる
+    # 入力は事前検査せず、演算結果の非有限値だけをまとめてinfへ置き換える
+    # (NaN入力はNaNのまま伝播してくるので最後のisfinite 1回で拾える)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if mode_id == 0:
+            # 元実装に合わせ、Ach=0のサンプルもinf扱いにする
+            c = np.where(a != 0, np.abs(a / b), np.inf)
+        elif mode_id == 1:
+            c = b / a
+        elif mode_id == 2:
+            c = a * b
+        else:
+            return np.full(a.shape, np.inf)
+        return np.where(np.isfinite(c), c, np.inf)
+
+
+class SampleRing:
+    # 測定スレッドとGUIスレッドで共有する固定長リングバッファ (時間/Ach/Bchを別配列で持つ)
+    # 書き込みは測定スレッドのみで、カーソルを最後に進めるため読み手とのロックは不要
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.ach = np.empty(capacity, dtype=np.float64)
+        self.bch = np.empty(capacity, dtype=np.float64)
+        self.cursor = 0  # 累計書き込みサンプル数 (単調増加)
+
+    def append(self, timestamp, ach_value, bch_value):
+        i = self.cursor % self.capacity
+        self.times[i] = timestamp
+        # 'Overload' などの非数値は書き込み時点でNaNに寄せる
+        self.ach[i] = ach_value if isinstance(ach_value, (int, float)) else np.nan
+        self.bch[i] = bch_value if isinstance(bch_value, (int, float)) else np.nan
+        self.cursor += 1
+
+    def read_since(self, start):
+        # startから現在までの(時間, Ach, Bch)を返す。巻き戻しをまたがない限りゼロコピーのビュー
+        end = self.cursor
+        start = max(start, end - self.capacity)
+        n = end - start
+        if n <= 0:
+            empty = self.times[:0]
+            return end, empty, empty, empty
+        lo = start % self.capacity
+        if lo + n <= self.capacity:
+            sl = slice(lo, lo + n)
+            return end, self.times[sl], self.ach[sl], self.bch[sl]
+        split = self.capacity - lo
+        return (end,
+                np.concatenate((self.times[lo:], self.times[:n - split])),
+                np.concatenate((self.ach[lo:], self.ach[:n - split])),
+                np.concatenate((self.bch[lo:], self.bch[:n - split])))
+
+
+class MeasurementClass(Thread):
+    def __init__(self, command_queue, data_ring, resource_name, stop_event, is_ready_event):
+        super().__init__()
+        self.dmm = None
+        self.command_queue = command_queue
+        self.data_ring = data_ring
+        self.resource_name = resource_name
+        self.stop_event = stop_event
+        self.is_ready_event = is_ready_event
+
+    def _configure_session(self):
+        # モジュールレベルのResourceManagerを共有する (再生成はバックエンド走査で数秒かかる)
+        self.dmm = rm.open_resource(self.resource_name)
+        self.dmm.timeout = 10000
+        self.dmm.read_termination = '\n'
+        self.dmm.write_termination = '\n'
+        self.dmm.chunk_size = 102400
+
+    def run(self):
+        try:
+            self._configure_session()
+        except Exception as e:
+            print(f"MeasurementClass: 機器のオープンに失敗しました: {e}")
+            return
+
+        start_time = time.time()
+
+        while not self.stop_event.wait(0):
+            self.check_commands()
+            try:
+                ach_value, bch_value = self.read_measurement()
+                if ach_value is not None:
+                    timestamp = time.time() - start_time
+                    self.data_ring.append(timestamp, ach_value, bch_value)
+                    if not self.is_ready_event.is_set():
+                        self.is_ready_event.set()
+            except Exception as e:
+                print(f"MeasurementClass: 例外が発生しました: {e}")
+
+        self.dmm.close()
+        print("MeasurementClass: プロセスが終了しました。")
+
+    def check_commands(self):
+        while True:
+            try:
+                command = self.command_queue.get_nowait()
+            except queue.Empty:
+                return
+            if command == "STOP":
+                self.stop_event.set()
+            elif command.startswith("SEND "):
+                cmd = command[5:]
+                self.send_command(cmd)
+            elif command == "TRIGGER":
+                self.send_command("*TRG")
+
+    def send_command(self, command):
+        try:
+            self.dmm.clear()
+            self.dmm.write(command)
+            for _ in range(50):
+                try:
+                    if self.dmm.query("*OPC?").strip() == "1":
+                        break
+                except pyvisa.errors.VisaIOError:
+                    time.sleep(0.2)
+        except Exception as e:
+            print(f"MeasurementClass: コマンドの送信中にエラーが発生しました: {e}")
+
+    def read_measurement(self):
+        try:
+            raw = self.dmm.read_bytes(self.dmm.chunk_size, break_on_termchar=True)
+            ach_value = None
+            bch_value = None
+
+            for prefix, flag, value_str in _MEAS_RE.findall(raw):
+                if flag == b'O':
+                    # オーバーロード応答の値フィールドは使わないので中身は見ない
+                    value = 'Overload'
+                else:
+                    try:
+                        value = float(value_str)
+                    except ValueError:
+                        continue
+                    if value == -0.0:
+                        value = 0.0
+
+                if ach_value is None:
+                    ach_value = value
+                elif bch_value is None:
+                    bch_value = value
+                else:
+                    break
+
+            if ach_value is None:
+                return None, None
+
+            return ach_value, bch_value
+        except pyvisa.errors.VisaIOError:
+            return None, None
+
+
+class DeviceSelectionPage(QWidget):
+    def __init__(self, resources):
+        super().__init__(parent=None)
+        self.resources = resources
+        self.selected_resource = None
+
+        layout = QVBoxLayout()
+        label = QLabel("以下の機器が見つかりました:")
+        layout.addWidget(label)
+
+        self.combo = QComboBox(parent=None)
+        self.combo.addItems(resources)
+        layout.addWidget(self.combo)
+
+        self.next_button = QPushButton("次へ")
+        self.next_button.setFixedSize(100, 40)
+        layout.addWidget(self.next_button, alignment=Qt.AlignRight)
+
+        self.setLayout(layout)
+
+
+class DMMSetupPage(QWidget):
+    def __init__(self, jig_modes):
+        super().__init__(parent=None)
+        self.jig_modes = jig_modes
+        self.measurement_options = [
+            ("F1", "直流電圧測定 (DCV-Ach)", "DCV", "V"),
+            ("F2", "交流電圧測定 (ACV-Ach)", "ACV", "V"),
+            ("F3", "抵抗測定 (2WΩ-Ach)", "OHM", "Ω"),
+            ("F5", "直流電流測定 (DCI-Ach)", "DCI", "A"),
+            ("F6", "交流電流測定 (ACI-Ach)", "ACI", "A"),
+            ("F7", "交流電圧測定 (AC+DC結合)", "ACVDCV", "V"),
+            ("F8", "交流電流測定 (AC+DC結合)", "ACIDCI", "A"),
+            ("F12", "Bch 直流電圧測定 (DCV-Bch)", "BDV", "V"),
+            ("F13", "ダイオード測定 (DIODE-Ach)", "DIODE", "V"),
+            ("F20", "ローパワー2WΩ(LP-2W-Ach)", "LP2W", "Ω"),
+            ("F22", "導通テスト (CONT-Ach)", "CONT", "Ω"),
+            ("F35", "Bch 直流電流測定 (DCI-Bch)", "BDI", "A"),
+            ("F36", "Bch 交流電流測定 (ACI-Bch)", "BAI", "A"),
+            ("F37", "Bch 交流電流測定 (AC+DC結合)", "BAIDCI", "A"),
+            ("F40", "温度測定 (TEMP)", "TEMP", "℃"),
+            ("F50", "周波数測定 (FREQ-Ach)", "FREQ", "Hz"),
+            ("DE0", "OFF", "", ""),
+        ]
+        self.range_dict = {
+            "F1": [
+                ("R0", "AUTO"),
+                ("R3", "200 mV"),
+                ("R4", "2 V"),
+                ("R5", "20 V"),
+                ("R6", "200 V"),
+                ("R7", "1000 V"),
+            ],
+            "F2": [
+                ("R0", "AUTO"),
+                ("R3", "200 mV"),
+                ("R4", "2 V"),
+                ("R5", "20 V"),
+                ("R6", "200 V"),
+                ("R7", "700 V"),
+            ],
+            "F3": [
+                ("R0", "AUTO"),
+                ("R3", "200 Ω"),
+                ("R4", "2 kΩ"),
+                ("R5", "20 kΩ"),
+                ("R6", "200 kΩ"),
+                ("R7", "2 MΩ"),
+                ("R8", "20 MΩ"),
+                ("R9", "200 MΩ"),
+            ],
+            "F5": [
+                ("R0", "AUTO"),
+                ("R1", "2000 nA"),
+                ("R2", "20 μA"),
+                ("R3", "200 μA"),
+                ("R4", "2 mA"),
+                ("R5", "20 mA"),
+                ("R6", "200 mA"),
+                ("R7", "2000 mA"),
+            ],
+            "F6": [
+                ("R0", "AUTO"),
+                ("R3", "200 μA"),
+                ("R4", "2 mA"),
+                ("R5", "20 mA"),
+                ("R6", "200 mA"),
+                ("R7", "2000 mA"),
+            ],
+            "F7": [
+                ("R0", "AUTO"),
+                ("R3", "200 mV"),
+                ("R4", "2 V"),
+                ("R5", "20 V"),
+                ("R6", "200 V"),
+                ("R7", "700 V"),
+            ],
+            "F8": [
+                ("R0", "AUTO"),
+                ("R3", "200 μA"),
+                ("R4", "2 mA"),
+                ("R5", "20 mA"),
+                ("R6", "200 mA"),
+                ("R7", "2000 mA"),
+            ],
+            "F12": [
+                ("R0", "AUTO"),
+                ("R3", "200 mV"),
+                ("R4", "2 V"),
+                ("R5", "20 V"),
+                ("R6", "200 V"),
+            ],
+            "F13": [
+                ("R0", "AUTO"),
+                ("R3", "200 Ω"),
+                ("R4", "2 kΩ"),
+                ("R5", "20 kΩ"),
+                ("R6", "200 kΩ"),
+                ("R7", "2 MΩ"),
+                ("R8", "20 MΩ"),
+                ("R9", "200 MΩ"),
+            ],
+            "F20": [
+                ("R0", "AUTO"),
+                ("R3", "200 Ω"),
+                ("R4", "2 kΩ"),
+                ("R5", "20 kΩ"),
+                ("R6", "200 kΩ"),
+                ("R7", "2 MΩ"),
+                ("R8", "20 MΩ"),
+            ],
+            "F22": [
+                ("R0", "AUTO"),
+                ("R3", "200 Ω"),
+                ("R4", "2 kΩ"),
+                ("R5", "20 kΩ"),
+                ("R6", "200 kΩ"),
+                ("R7", "2 MΩ"),
+                ("R8", "20 MΩ"),
+                ("R9", "200 MΩ"),
+            ],
+            "F35": [
+                ("R8", "10 A"),
+            ],
+            "F36": [
+                ("R8", "10 A"),
+            ],
+            "F37": [
+                ("R8", "10 A"),
+            ]
+        }
+        self._opt_index = {opt[0]: idx for idx, opt in enumerate(self.measurement_options)}
+        self._jig_by_name = {jig_mode[0]: jig_mode for jig_mode in self.jig_modes}
+
+        main_layout = QVBoxLayout()
+        self.setFont(_point_font(14))
+
+        mode_selection_group = QGroupBox("測定モードを選択してください")
+        mode_selection_layout = QHBoxLayout()
+        self.mode_group = QButtonGroup(parent=None)
+        self.normal_mode_radio = QRadioButton("通常測定モード")
+        self.jig_mode_radio = QRadioButton("ジグ使用計測モード")
+        self.mode_group.addButton(self.normal_mode_radio, id=0)
+        self.mode_group.addButton(self.jig_mode_radio, id=1)
+        self.normal_mode_radio.setChecked(True)
+
+        mode_selection_layout.addWidget(self.normal_mode_radio)
+        mode_selection_layout.addWidget(self.jig_mode_radio)
+        mode_selection_group.setLayout(mode_selection_layout)
+        main_layout.addWidget(mode_selection_group)
+
+        self.jig_selection_group = QGroupBox("ジグ測定モードを選択してください")
+        jig_selection_layout = QHBoxLayout()
+        self.jig_selection_combo = QComboBox(parent=None)
+        for jig_mode in self.jig_modes:
+            self.jig_selection_combo.addItem(jig_mode[0])
+        jig_selection_layout.addWidget(self.jig_selection_combo)
+        self.jig_selection_group.setLayout(jig_selection_layout)
+        self.jig_selection_group.hide()
+        main_layout.addWidget(self.jig_selection_group)
+
+        scroll = QScrollArea(parent=None)
+        scroll.setWidgetResizable(True)
+        scroll_widget = QWidget(parent=None)
+        scroll.setWidget(scroll_widget)
+        scroll_layout = QVBoxLayout(scroll_widget)
+
+        dsp1_group = QGroupBox("DSP1 の設定")
+        dsp1_layout = QVBoxLayout()
+        dsp1_options_layout = QGridLayout()
+
+        self.dsp1_option_group = QButtonGroup(parent=None)
+        for idx, (key, desc, prefix, unit) in enumerate(self.measurement_options):
+            if key == "DE0":
+                continue
+            btn = QRadioButton(desc)
+            self.dsp1_option_group.addButton(btn, idx)
+            dsp1_options_layout.addWidget(btn, idx // 4, idx % 4)
+        if self.dsp1_option_group.buttons():
+            self.dsp1_option_group.buttons()[0].setChecked(True)
+        dsp1_layout.addLayout(dsp1_options_layout)
+
+        dsp1_range_label = QLabel("レンジを選択してください:")
+        dsp1_layout.addWidget(dsp1_range_label)
+        self.dsp1_range_group = QButtonGroup(parent=None)
+        self.dsp1_range_layout = QGridLayout()
+        dsp1_layout.addLayout(self.dsp1_range_layout)
+        self._dsp1_range_btns = self._build_range_button_pool(self.dsp1_range_group, self.dsp1_range_layout)
+        self._dsp1_range_label = QLabel("レンジ設定はありません")
+        self._dsp1_range_label.hide()
+        self.dsp1_range_layout.addWidget(self._dsp1_range_label, 2, 0, 1, 8)
+        self.update_dsp1_ranges()
+
+        self.dsp1_option_group.buttonClicked.connect(self.update_dsp1_ranges)
+        dsp1_group.setLayout(dsp1_layout)
+        scroll_layout.addWidget(dsp1_group)
+
+        dsp2_group = QGroupBox("DSP2 の設定")
+        dsp2_layout = QVBoxLayout()
+        dsp2_options_layout = QGridLayout()
+
+        self.dsp2_option_group = QButtonGroup(parent=None)
+        for idx, (key, desc, prefix, unit) in enumerate(self.measurement_options):
+            btn = QRadioButton(desc)
+            self.dsp2_option_group.addButton(btn, idx)
+            dsp2_options_layout.addWidget(btn, idx // 4, idx % 4)
+        if self.dsp2_option_group.buttons():
+            self.dsp2_option_group.buttons()[0].setChecked(False)
+        self._dsp2_off_btn = self.dsp2_option_group.button(self._opt_index["DE0"])
+        dsp2_layout.addLayout(dsp2_options_layout)
+
+        dsp2_range_label = QLabel("レンジを選択してください:")
+        dsp2_layout.addWidget(dsp2_range_label)
+        self.dsp2_range_group = QButtonGroup(parent=None)
+        self.dsp2_range_layout = QGridLayout()
+        dsp2_layout.addLayout(self.dsp2_range_layout)
+        self._dsp2_range_btns = self._build_range_button_pool(self.dsp2_range_group, self.dsp2_range_layout)
+        self._dsp2_range_label = QLabel("レンジ設定はありません")
+        self._dsp2_range_label.hide()
+        self.dsp2_range_layout.addWidget(self._dsp2_range_label, 2, 0, 1, 8)
+        self.update_dsp2_ranges()
+
+        self.dsp2_option_group.buttonClicked.connect(self.update_dsp2_ranges)
+        dsp2_group.setLayout(dsp2_layout)
+        scroll_layout.addWidget(dsp2_group)
+
+        trigger_sampling_layout = QVBoxLayout()
+
+        trigger_group = QGroupBox("トリガーモード")
+        trigger_layout = QHBoxLayout()
+        self.trigger_group = QButtonGroup(parent=None)
+        self.trigger_radio1 = QRadioButton("IMMEDIATE (TRS0)")
+        self.trigger_radio1.setChecked(True)
+        self.trigger_radio3 = QRadioButton("BUS (TRS3)")
+        self.trigger_group.addButton(self.trigger_radio1)
+        self.trigger_group.addButton(self.trigger_radio3)
+        trigger_layout.addWidget(self.trigger_radio1)
+        trigger_layout.addWidget(self.trigger_radio3)
+        trigger_group.setLayout(trigger_layout)
+
+        sampling_group = QGroupBox("サンプリングレート")
+        sampling_layout = QHBoxLayout()
+        self.sampling_group = QButtonGroup(parent=None)
+        self.sampling_radio1 = QRadioButton("FAST (PR1)")
+        self.sampling_radio1.setChecked(True)
+        self.sampling_radio2 = QRadioButton("MED (PR2)")
+        self.sampling_radio3 = QRadioButton("SLOW1 (PR3)")
+        self.sampling_radio4 = QRadioButton("SLOW2 (PR4)")
+        self.sampling_group.addButton(self.sampling_radio1)
+        self.sampling_group.addButton(self.sampling_radio2)
+        self.sampling_group.addButton(self.sampling_radio3)
+        self.sampling_group.addButton(self.sampling_radio4)
+        sampling_layout.addWidget(self.sampling_radio1)
+        sampling_layout.addWidget(self.sampling_radio2)
+        sampling_layout.addWidget(self.sampling_radio3)
+        sampling_layout.addWidget(self.sampling_radio4)
+        sampling_group.setLayout(sampling_layout)
+
+        auto_zero_group = QGroupBox("オートゼロ設定")
+        auto_zero_layout = QHBoxLayout()
+        self.auto_zero_group = QButtonGroup(parent=None)
+        self.auto_zero_radio_off = QRadioButton("OFF")
+        self.auto_zero_radio_on = QRadioButton("ON")
+        self.auto_zero_radio_once = QRadioButton("ONCE (一度実行後、OFF)")
+        self.auto_zero_group.addButton(self.auto_zero_radio_off, id=0)
+        self.auto_zero_group.addButton(self.auto_zero_radio_on, id=1)
+        self.auto_zero_group.addButton(self.auto_zero_radio_once, id=2)
+        self.auto_zero_radio_off.setChecked(True)
+        auto_zero_layout.addWidget(self.auto_zero_radio_off)
+        auto_zero_layout.addWidget(self.auto_zero_radio_on)
+        auto_zero_layout.addWidget(self.auto_zero_radio_once)
+        auto_zero_group.setLayout(auto_zero_layout)
+
+        trigger_auto_zero_layout = QHBoxLayout()
+        trigger_auto_zero_layout.addWidget(trigger_group)
+        trigger_auto_zero_layout.addWidget(auto_zero_group)
+
+        trigger_sampling_layout.addLayout(trigger_auto_zero_layout)
+        trigger_sampling_layout.addWidget(sampling_group)
+        scroll_layout.addLayout(trigger_sampling_layout)
+
+        main_layout.addWidget(scroll)
+
+        button_layout = QHBoxLayout()
+        self.next_button = QPushButton("次へ")
+        self.next_button.setFixedSize(100, 40)
+        button_layout.addStretch()
+        button_layout.addWidget(self.next_button)
+        main_layout.addLayout(button_layout)
+
+        self.setLayout(main_layout)
+        self.mode_group.buttonClicked.connect(self.handle_mode_selection)
+        self.jig_selection_combo.currentIndexChanged.connect(self.handle_jig_mode_selection)
+
+    def handle_mode_selection(self, button):
+        mode_id = self.mode_group.id(button)
+        if mode_id == 0:
+            self.set_normal_mode()
+        else:
+            self.set_jig_mode()
+
+    def handle_jig_mode_selection(self):
+        self.update_dsp1_ranges()
+        self.update_dsp2_ranges()
+
+    def set_normal_mode(self):
+        self.jig_selection_group.hide()
+        for btn in self.dsp1_option_group.buttons():
+            btn.setEnabled(True)
+        for btn in self.dsp2_option_group.buttons():
+            btn.setEnabled(True)
+
+        if self.dsp2_option_group.checkedId() == -1 and self._dsp2_off_btn is not None:
+            self._dsp2_off_btn.setChecked(True)
+
+    def set_jig_mode(self):
+        self.jig_selection_group.show()
+        self.jig_selection_combo.setCurrentIndex(0)
+        self.update_dsp1_ranges()
+        self.update_dsp2_ranges()
+        for btn in self.dsp1_option_group.buttons():
+            btn.setEnabled(False)
+        for btn in self.dsp2_option_group.buttons():
+            btn.setEnabled(False)
+
+    def _build_range_button_pool(self, group, layout):
+        # レンジ数の最大値ぶんのボタンを先に作っておき、以後はテキスト差し替えで使い回す
+        buttons = []
+        for i in range(10):
+            btn = QRadioButton()
+            btn.hide()
+            group.addButton(btn, i)
+            layout.addWidget(btn, i // 8, i % 8)
+            buttons.append(btn)
+        return buttons
+
+    def _apply_range_buttons(self, buttons, label, ranges):
+        for idx, btn in enumerate(buttons):
+            if idx < len(ranges):
+                btn.setText(ranges[idx][1])
+                btn.show()
+            else:
+                btn.hide()
+        if ranges:
+            label.hide()
+            buttons[0].setChecked(True)
+        else:
+            label.show()
+
+    def update_dsp1_ranges(self):
+        mode_id = self.mode_group.checkedId()
+        if mode_id == 1:
+            jig_mode_name = self.jig_selection_combo.currentText()
+            jig_mode = self._jig_by_name.get(jig_mode_name)
+            dsp1_key = jig_mode[1] if jig_mode else None
+            if dsp1_key is None:
+                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP1キーが見つかりません。")
+                return
+        else:
+            idx = self.dsp1_option_group.checkedId()
+            if idx == -1:
+                QMessageBox.critical(self, "エラー", "DSP1の測定項目が選択されていません。")
+                return
+            dsp1_key = self.measurement_options[idx][0]
+
+        ranges = self.range_dict.get(dsp1_key, []) if dsp1_key else []
+        self._apply_range_buttons(self._dsp1_range_btns, self._dsp1_range_label, ranges)
+
+    def update_dsp2_ranges(self):
+        mode_id = self.mode_group.checkedId()
+        if mode_id == 1:
+            jig_mode_name = self.jig_selection_combo.currentText()
+            jig_mode = self._jig_by_name.get(jig_mode_name)
+            dsp2_key = jig_mode[2] if jig_mode else None
+            if dsp2_key is None:
+                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP2キーが見つかりません。")
+                return
+        else:
+            idx = self.dsp2_option_group.checkedId()
+            if idx == -1:
+                self._dsp2_range_label.setText("DSP2は選択されていません。")
+                self._apply_range_buttons(self._dsp2_range_btns, self._dsp2_range_label, [])
+                return
+            dsp2_key = self.measurement_options[idx][0]
+
+        ranges = self.range_dict.get(dsp2_key, []) if dsp2_key else []
+        self._dsp2_range_label.setText("レンジ設定はありません")
+        self._apply_range_buttons(self._dsp2_range_btns, self._dsp2_range_label, ranges)
+
+    def get_setup_commands(self):
+        commands = []
+        mode_id = self.mode_group.checkedId()
+        if mode_id == 0:
+            idx = self.dsp1_option_group.checkedId()
+            if idx == -1:
+                QMessageBox.critical(self, "エラー", "DSP1の測定項目が選択されていません。")
+                return []
+            dsp1_key, _, _, _ = self.measurement_options[idx]
+            commands.append(f"DSP1,{dsp1_key}")
+
+            if self.dsp1_range_group.buttons():
+                range_idx = self.dsp1_range_group.checkedId()
+                ranges = self.range_dict.get(dsp1_key, [])
+                if 0 <= range_idx < len(ranges):
+                    range_key, _ = ranges[range_idx]
+                    commands.append(f"DSP1,{range_key}")
+
+            idx = self.dsp2_option_group.checkedId()
+            if idx == -1:
+                commands.append("DE0")
+            else:
+                dsp2_key, _, _, _ = self.measurement_options[idx]
+                if dsp2_key == "DE0":
+                    commands.append("DE0")
+                else:
+                    commands.append(f"DSP2,{dsp2_key}")
+                    if self.dsp2_range_group.buttons():
+                        range_idx = self.dsp2_range_group.checkedId()
+                        ranges = self.range_dict.get(dsp2_key, [])
+                        if 0 <= range_idx < len(ranges):
+                            range_key, _ = ranges[range_idx]
+                            commands.append(f"DSP2,{range_key}")
+        else:
+            jig_mode_name = self.jig_selection_combo.currentText()
+            jig_mode = self._jig_by_name.get(jig_mode_name)
+            dsp1_key = jig_mode[1] if jig_mode else None
+            dsp2_key = jig_mode[2] if jig_mode else None
+
+            if dsp1_key and dsp1_key in self.range_dict:
+                commands.append(f"DSP1,{dsp1_key}")
+                ranges_dsp1 = self.range_dict.get(dsp1_key, [])
+                range_idx = self.dsp1_range_group.checkedId()
+                if 0 <= range_idx < len(ranges_dsp1):
+                    range_key, _ = ranges_dsp1[range_idx]
+                    commands.append(f"DSP1,{range_key}")
+            else:
+                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP1設定に誤りがあります。")
+                return []
+
+            if dsp2_key and dsp2_key in self.range_dict:
+                commands.append(f"DSP2,{dsp2_key}")
+                ranges_dsp2 = self.range_dict.get(dsp2_key, [])
+                range_idx = self.dsp2_range_group.checkedId()
+                if 0 <= range_idx < len(ranges_dsp2):
+                    range_key, _ = ranges_dsp2[range_idx]
+                    commands.append(f"DSP2,{range_key}")
+            else:
+                QMessageBox.critical(self, "エラー", f"ジグ測定モード '{jig_mode_name}' のDSP2設定に誤りがあります。")
+                return []
+
+        auto_zero_id = self.auto_zero_group.checkedId()
+        if auto_zero_id == 0:
+            commands.append("AZ0")
+        elif auto_zero_id == 1:
+            commands.append("AZ1")
+        elif auto_zero_id == 2:
+            commands.append("AZ2")
+
+        if self.trigger_radio1.isChecked():
+            commands.append("TRS0")
+        elif self.trigger_radio3.isChecked():
+            commands.append("TRS3")
+
+        if self.sampling_radio1.isChecked():
+            commands.append("PR1")
+        elif self.sampling_radio2.isChecked():
+            commands.append("PR2")
+        elif self.sampling_radio3.isChecked():
+            commands.append("PR3")
+        elif self.sampling_radio4.isChecked():
+            commands.append("PR4")
+
+        return commands
+
+    def get_trigger_mode(self):
+        if self.trigger_radio1.isChecked():
+            return "TRS0"
+        elif self.trigger_radio3.isChecked():
+            return "TRS3"
+
+    def get_measurement_modes(self):
+        mode_id = self.mode_group.checkedId()
+        if mode_id == 0:
+            idx = self.dsp1_option_group.checkedId()
+            if idx == -1:
+                dsp1_desc = ""
+                dsp1_prefix = ""
+                dsp1_unit = ""
+            else:
+                dsp1_desc = self.measurement_options[idx][1]
+                dsp1_prefix = self.measurement_options[idx][2]
+                dsp1_unit = self.measurement_options[idx][3]
+
+            idx = self.dsp2_option_group.checkedId()
+            if idx == -1:
+                dsp2_desc = None
+                dsp2_prefix = None
+                dsp2_unit = None
+            else:
+                dsp2_key, dsp2_desc, dsp2_prefix, dsp2_unit = self.measurement_options[idx]
+                if dsp2_key == "DE0":
+                    dsp2_desc = None
+                    dsp2_prefix = None
+                    dsp2_unit = None
+
+            return (dsp1_desc, dsp1_prefix, dsp1_unit), (dsp2_desc, dsp2_prefix, dsp2_unit)
+
+        else:
+            jig_mode_name = self.jig_selection_combo.currentText()
+            dsp1_desc = ""
+            dsp1_prefix = ""
+            dsp1_unit = ""
+            dsp2_desc = ""
+            dsp2_prefix = ""
+            dsp2_unit = ""
+            jig_mode = self._jig_by_name.get(jig_mode_name)
+            if jig_mode:
+                dsp1_key = jig_mode[1]
+                dsp2_key = jig_mode[2]
+                dsp1_idx = self.get_measurement_option_index(dsp1_key)
+                dsp2_idx = self.get_measurement_option_index(dsp2_key)
+                if dsp1_idx != -1:
+                    dsp1_desc = self.measurement_options[dsp1_idx][1]
+                    dsp1_prefix = self.measurement_options[dsp1_idx][2]
+                    dsp1_unit = self.measurement_options[dsp1_idx][3]
+                else:
+                    QMessageBox.critical(self, "エラー",
+                                         f"ジグ測定モード '{jig_mode_name}' のDSP1キーが見つかりません。")
+                if dsp2_idx != -1:
+                    dsp2_desc = self.measurement_options[dsp2_idx][1]
+                    dsp2_prefix = self.measurement_options[dsp2_idx][2]
+                    dsp2_unit = self.measurement_options[dsp2_idx][3]
+                else:
+                    QMessageBox.critical(self, "エラー",
+                                         f"ジグ測定モード '{jig_mode_name}' のDSP2キーが見つかりません。")
+            return (dsp1_desc, dsp1_prefix, dsp1_unit), (dsp2_desc, dsp2_prefix, dsp2_unit)
+
+    def get_measurement_option_index(self, key):
+        return self._opt_index.get(key, -1)
+
+
+class ModeSelectionPage(QWidget):
+    def __init__(self):
+        super().__init__(parent=None)
+        layout = QVBoxLayout()
+        label = QLabel("モードを選択してください:")
+        layout.addWidget(label)
+
+        button_layout = QHBoxLayout()
+        self.value_display_button = QPushButton("値表示モード")
+        self.value_display_button.setFixedSize(200, 60)
+        self.graph_display_button = QPushButton("グラフ表示モード")
+        self.graph_display_button.setFixedSize(200, 60)
+        button_layout.addWidget(self.value_display_button)
+        button_layout.addWidget(self.graph_display_button)
+        layout.addLayout(button_layout)
+
+        self.reset_button = QPushButton("リセット")
+        self.reset_button.setFixedSize(100, 40)
+        layout.addWidget(self.reset_button, alignment=Qt.AlignRight)
+        self.setLayout(layout)
+
+
+class ValueDisplayPage(QWidget):
+    def __init__(self):
+        super().__init__(parent=None)
+        self.calculated_unit = None
+        layout = QVBoxLayout()
+        self.value_label_ach = QLabel("---")
+        self.value_label_bch = QLabel("---")
+        self.value_label_calculated = QLabel("---")
+
+        big_font = _point_font(72)
+        self.value_label_ach.setFont(big_font)
+        self.value_label_bch.setFont(big_font)
+        self.value_label_calculated.setFont(big_font)
+
+        self.value_label_ach.setAlignment(_ALIGN_LEFT)
+        self.value_label_bch.setAlignment(_ALIGN_LEFT)
+        self.value_label_calculated.setAlignment(_ALIGN_LEFT)
+
+        layout.addWidget(self.value_label_ach)
+        layout.addWidget(self.value_label_bch)
+        layout.addWidget(self.value_label_calculated)
+
+        button_layout = QHBoxLayout()
+        self.trigger_button = QPushButton("トリガー")
+        self.switch_display_button = QPushButton("表示切替")
+        self.reset_button = QPushButton("リセット")
+        button_layout.addWidget(self.trigger_button)
+        button_layout.addWidget(self.switch_display_button)
+        button_layout.addWidget(self.reset_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+        self.ach_desc = ""
+        self.bch_desc = ""
+        self.calculated_value_desc = ""
+        self.jig_mode = False
+
+        # 直前に表示した文字列 (同じ値なら setText を省いて再描画を抑える)
+        self._last_ach_text = None
+        self._last_bch_text = None
+        self._last_calculated_text = None
+
+        # 現在の(Ach, Bch, 計算値)ラベルの表示状態。生成直後はすべて表示
+        self._visible_state = (True, True, True)
+
+    def _apply_visibility(self, jig_mode, bch_visible):
+        # show/hideはレイアウト再計算を伴うため、状態が変わるときだけ呼ぶ
+        want = (not jig_mode, (not jig_mode) and bch_visible, jig_mode)
+        if want == self._visible_state:
+            return
+        self._visible_state = want
+        self.value_label_ach.setVisible(want[0])
+        self.value_label_bch.setVisible(want[1])
+        self.value_label_calculated.setVisible(want[2])
+
+    def set_measurement_mode_descriptions(self, ach_desc, bch_desc, jig_mode=False,
+                                          calculated_value_desc="", calculated_unit=""):
+        self.ach_desc = ach_desc
+        self.bch_desc = bch_desc
+        self.jig_mode = jig_mode
+        self.calculated_value_desc = calculated_value_desc
+        self.calculated_unit = calculated_unit
+        self._last_ach_text = None
+        self._last_bch_text = None
+        self._last_calculated_text = None
+
+        if jig_mode:
+            self.value_label_calculated.setText(f"{self.calculated_value_desc}: --- {self.calculated_unit}")
+        else:
+            self.value_label_ach.setText(f"{self.ach_desc}: ---")
+            if self.bch_desc:
+                self.value_label_bch.setText(f"{self.bch_desc}: ---")
+        self._apply_visibility(jig_mode, bool(self.bch_desc))
+
+    def update_values(self, ach_value, bch_value, calculated_value=None,
+                      ach_unit="", bch_unit="", calculated_unit="", jig_mode=False):
+        self.jig_mode = jig_mode
+        if jig_mode:
+            if calculated_value is None or calculated_value == 'Overload' or not _isfinite(calculated_value):
+                calculated_text = f"{self.calculated_value_desc}: Overload"
+            else:
+                if calculated_unit:
+                    formatted_value = _fmt_si_cached(calculated_value, calculated_unit)
+                else:
+                    formatted_value = f"{calculated_value:.3f}"
+                calculated_text = f"{self.calculated_value_desc}: {formatted_value}"
+            if calculated_text != self._last_calculated_text:
+                self.value_label_calculated.setText(calculated_text)
+                self._last_calculated_text = calculated_text
+        else:
+            if ach_value == 'Overload' or _isnan(ach_value):
+                ach_text = f"{self.ach_desc}: Overload"
+            else:
+                formatted_value = _fmt_si_cached(ach_value, ach_unit)
+                ach_text = f"{self.ach_desc}: {formatted_value}"
+            if ach_text != self._last_ach_text:
+                self.value_label_ach.setText(ach_text)
+                self._last_ach_text = ach_text
+
+            if self.bch_desc:
+                if bch_value == 'Overload' or _isnan(bch_value):
+                    bch_text = f"{self.bch_desc}: Overload"
+                else:
+                    formatted_value = _fmt_si_cached(bch_value, bch_unit)
+                    bch_text = f"{self.bch_desc}: {formatted_value}"
+                if bch_text != self._last_bch_text:
+                    self.value_label_bch.setText(bch_text)
+                    self._last_bch_text = bch_text
+
+        self._apply_visibility(jig_mode, bool(self.bch_desc))
+
+
+class GraphDisplayPage(QWidget):
+    # 保存スレッドからGUIスレッドへ完了通知を返す (bool: 成否, str: パスまたはエラー)
+    save_finished = pyqtSignal(bool, str)
+
+    _BUF_CAP = 200_000
+    # 記録バッファの上限行数 (約3列×8バイト×100万行 ≒ 24MB)
+    _REC_CAP = 1_000_000
+
+    def __init__(self):
+        super().__init__(parent=None)
+        self.bch_desc = None
+        self.ach_desc = None
+        self.line_bch = None
+        self.line_ach = None
+        self.line_calculated = None
+        _set_japanese_font()
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.ax_ach = None
+        self.ax_bch = None
+        self.ax_calculated = None
+        self._flush_impl = self._flush_single
+
+        # ブリッティング用の背景キャッシュ (リサイズや軸範囲変更で無効化する)
+        self._blit_bg = None
+        self._blit_limits = None
+        self._tick_keys = {}
+        self.canvas.mpl_connect('resize_event', self._on_canvas_resize)
+
+        self.value_label_ach = QLabel("---")
+        self.value_label_bch = QLabel("---")
+        self.value_label_calculated = QLabel("---")
+
+        mid_font = _point_font(24)
+        self.value_label_ach.setFont(mid_font)
+        self.value_label_bch.setFont(mid_font)
+        self.value_label_calculated.setFont(mid_font)
+
+        self.value_label_ach.setAlignment(_ALIGN_LEFT)
+        self.value_label_bch.setAlignment(_ALIGN_CENTER)
+        self.value_label_calculated.setAlignment(_ALIGN_RIGHT)
+
+        main_layout = QVBoxLayout()
+        main_layout.setContentsMargins(5, 5, 5, 5)
+        main_layout.setSpacing(5)
+
+        labels_layout = QHBoxLayout()
+        labels_layout.setContentsMargins(0, 0, 0, 0)
+        labels_layout.setSpacing(10)
+        self.value_label_ach.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
+        self.value_label_bch.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
+        self.value_label_calculated.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
+
+        labels_layout.addWidget(self.value_label_ach, alignment=Qt.AlignLeft)
+        labels_layout.addStretch(1)
+        labels_layout.addWidget(self.value_label_bch, alignment=Qt.AlignCenter)
+        labels_layout.addStretch(1)
+        labels_layout.addWidget(self.value_label_calculated, alignment=Qt.AlignRight)
+        main_layout.addLayout(labels_layout)
+
+        self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        main_layout.addWidget(self.canvas, stretch=1)
+
+        time_setting_layout = QHBoxLayout()
+        time_setting_layout.setContentsMargins(0, 0, 0, 0)
+        time_setting_layout.setSpacing(5)
+        time_label = QLabel("時間軸の最大表示量（秒）:")
+        self.time_input = QLineEdit("10")
+        self.time_input.setFixedWidth(80)
+        # ホットパスで毎回 text() をパースしないよう、編集確定時にキャッシュする
+        self._max_display_time = 10.0
+        self.time_input.editingFinished.connect(self._on_time_changed)
+        time_setting_layout.addWidget(time_label)
+        time_setting_layout.addWidget(self.time_input)
+        time_setting_layout.addStretch()
+        main_layout.addLayout(time_setting_layout)
+
+        button_layout = QHBoxLayout()
+        button_layout.setContentsMargins(0, 0, 0, 0)
+        button_layout.setSpacing(5)
+
+        self.trigger_button = QPushButton("トリガー")
+        self.switch_display_button = QPushButton("表示切替")
+        self.recording_button = QPushButton("記録開始")
+        self.reset_graph_button = QPushButton("グラフリセット")
+        self.reset_button = QPushButton("リセット")
+
+        button_layout.addWidget(self.trigger_button)
+        button_layout.addWidget(self.switch_display_button)
+        button_layout.addWidget(self.recording_button)
+        button_layout.addWidget(self.reset_graph_button)
+        button_layout.addWidget(self.reset_button)
+        button_layout.addStretch()
+
+        main_layout.addLayout(button_layout)
+        self.setLayout(main_layout)
+
+        # 表示データは1本の(N, 4)バッファに持つ (列: 0=時間, 1=Ach, 2=Bch, 3=計算値)
+        self._buf = np.empty((self._BUF_CAP, 4), dtype=np.float64)
+        self._buf_len = 0
+        self.start_time = time.time()
+        self.ach_unit = ""
+        self.bch_unit = ""
+        self.calculated_unit = ""
+        self.calculated_value_desc = ""
+        self.jig_mode = False
+
+        # 直前に表示した文字列 (同じ値なら setText を省いて再描画を抑える)
+        self._last_ach_text = None
+        self._last_bch_text = None
+        self._last_calculated_text = None
+
+        self.recording = False
+        # 記録データは(時間, 値...)を1行とするNumPyバッファに溜める
+        # (上限までは倍々に拡張し、上限到達後は古い行を捨てるローリング記録になる)
+        self._rec_buf = np.empty((1024, 3), dtype=np.float64)
+        self._rec_len = 0
+        self._rec_cols = 3
+
+        # サンプル取り込みと描画を分離し、描画はシングルショットで約30Hzに間引く
+        self._pending_redraw = False
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.timeout.connect(self._flush_redraw)
+
+        # CSV保存は専用の1ワーカーで直列に行う (保存の多重実行も防げる)
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+
+        self.recording_button.clicked.connect(self.toggle_recording)
+        self.reset_graph_button.clicked.connect(self.reset_graph)
+        self.save_finished.connect(self._on_save_finished)
+
+    def load_data_from_arrays(self, t, a, b, jig_mode, jig_mode_name, measurement_mode_bch):
+        if not t.size:
+            return
+
+        if jig_mode:
+            calculated = _jig_calc(_JIG_MODE_IDS.get(jig_mode_name), a, b)
+            self.update_graph(
+                ach_values=[],
+                bch_values=[],
+                time_values=t,
+                calculated_values=calculated
+            )
+        else:
+            self.update_graph(
+                ach_values=a,
+                bch_values=b if measurement_mode_bch else None,
+                time_values=t
+            )
+
+    def set_measurement_mode_descriptions(self, ach_desc, bch_desc, jig_mode=False,
+                                          calculated_value_desc="", calculated_unit=""):
+        self.ach_desc = ach_desc
+        self.bch_desc = bch_desc
+        self.jig_mode = jig_mode
+        self.calculated_value_desc = calculated_value_desc
+        self.calculated_unit = calculated_unit
+        self._last_ach_text = None
+        self._last_bch_text = None
+        self._last_calculated_text = None
+        # モード分岐を毎フレーム評価せず、ここで一度だけ描画ハンドラを選ぶ
+        self._flush_impl = (self._flush_jig if jig_mode
+                            else (self._flush_dual if bch_desc else self._flush_single))
+
+        self.figure.clf()
+        max_display_time = self._max_display_time
+
+        if self.jig_mode:
+            self.ax_calculated = self.figure.add_subplot(1, 1, 1)
+            self.ax_calculated.set_title(self.calculated_value_desc)
+            self.line_calculated, = self.ax_calculated.plot([], [], color='red', linewidth=1, animated=True)
+            self.ax_calculated.grid(True, linestyle='--', color='gray', linewidth=0.5)
+            self.ax_calculated.set_xlim(0, max_display_time)
+            self.ax_calculated.set_xlabel("時間 (秒)")
+            self.ax_calculated.set_ylabel(f"{self.calculated_value_desc} ({self.calculated_unit})")
+            self.ax_calculated.ticklabel_format(useOffset=False, style='plain')
+        else:
+            if self.bch_desc:
+                self.ax_ach = self.figure.add_subplot(2, 1, 1)
+                self.ax_bch = self.figure.add_subplot(2, 1, 2)
+                self.ax_ach.set_title(self.ach_desc)
+                self.ax_bch.set_title(self.bch_desc)
+                self.line_ach, = self.ax_ach.plot([], [], color='green', linewidth=1, animated=True)
+                self.line_bch, = self.ax_bch.plot([], [], color='blue', linewidth=1, animated=True)
+                self.ax_ach.grid(True, linestyle='--', color='gray', linewidth=0.5)
+                self.ax_bch.grid(True, linestyle='--', color='gray', linewidth=0.5)
+                self.ax_ach.set_xlim(0, max_display_time)
+                self.ax_bch.set_xlim(0, max_display_time)
+                self.ax_ach.set_xlabel("時間 (秒)")
+                self.ax_ach.set_ylabel(f"{self.ach_desc} ({self.ach_unit})")
+                self.ax_bch.set_xlabel("時間 (秒)")
+                self.ax_bch.set_ylabel(f"{self.bch_desc} ({self.bch_unit})")
+                self.ax_ach.ticklabel_format(useOffset=False, style='plain')
+                self.ax_bch.ticklabel_format(useOffset=False, style='plain')
+            else:
+                self.ax_ach = self.figure.add_subplot(1, 1, 1)
+                self.ax_ach.set_title(self.ach_desc)
+                self.line_ach, = self.ax_ach.plot([], [], color='green', linewidth=1, animated=True)
+                self.ax_ach.grid(True, linestyle='--', color='gray', linewidth=0.5)
+                self.ax_ach.set_xlim(0, max_display_time)
+                self.ax_ach.set_xlabel("時間 (秒)")
+                self.ax_ach.set_ylabel(f"{self.ach_desc} ({self.ach_unit})")
+                self.ax_ach.ticklabel_format(useOffset=False, style='plain')
+
+        self.figure.tight_layout()
+        # 再構築直後に一度描画して背景を取り直し、次のフレームからブリットできるようにする
+        self._blit_bg = None
+        self._tick_keys.clear()
+        self._draw_frame()
+
+    def _on_time_changed(self):
+        try:
+            self._max_display_time = float(self.time_input.text())
+        except ValueError:
+            self._max_display_time = 10
+
+    def _on_canvas_resize(self, event):
+        self._blit_bg = None
+
+    def _active_artists(self):
+        if self.jig_mode:
+            artists = [(self.ax_calculated, self.line_calculated)]
+        elif self.bch_desc:
+            artists = [(self.ax_ach, self.line_ach), (self.ax_bch, self.line_bch)]
+        else:
+            artists = [(self.ax_ach, self.line_ach)]
+        return [(ax, line) for ax, line in artists if ax is not None]
+
+    def _draw_frame(self):
+        artists = self._active_artists()
+        if not artists:
+            self.canvas.draw()
+            return
+
+        limits = tuple(ax.get_xlim() + ax.get_ylim() for ax, _ in artists)
+        if self._blit_bg is None or limits != self._blit_limits:
+            # 軸範囲が変わったフレームは全再描画して背景を取り直す
+            self.canvas.draw()
+            self._blit_bg = [self.canvas.copy_from_bbox(ax.bbox) for ax, _ in artists]
+            self._blit_limits = limits
+        else:
+            for (ax, _), bg in zip(artists, self._blit_bg):
+                self.canvas.restore_region(bg)
+
+        for ax, line in artists:
+            ax.draw_artist(line)
+            self.canvas.blit(ax.bbox)
+        self.canvas.flush_events()
+
+    def _coerce_floats(self, values):
+        # DMMApp側からは既にfloat64のndarrayで届くので、その場合は変換しない
+        if isinstance(values, np.ndarray):
+            return values
+        # 'Overload' や None は NaN として格納し、グラフ上は欠損として扱う
+        return np.fromiter(
+            (v if isinstance(v, (int, float)) else np.nan for v in values),
+            dtype=np.float64, count=len(values))
+
+    def _append_samples(self, time_values, ach_values, bch_values, calculated_values):
+        if self.jig_mode and calculated_values is not None and len(calculated_values):
+            # float('inf') はマスク1回でまとめてフィルタリング
+            cv = self._coerce_floats(calculated_values)
+            tv = self._coerce_floats(time_values)
+            mask = np.isfinite(cv)
+            cols = [(0, tv[mask]), (3, cv[mask])]
+        else:
+            cols = [(0, self._coerce_floats(time_values)),
+                    (1, self._coerce_floats(ach_values))]
+            if self.bch_desc:
+                if bch_values is None or not len(bch_values):
+                    bch_values = [None] * len(time_values)
+                cols.append((2, self._coerce_floats(bch_values)))
+
+        n = len(cols[0][1])
+        if n == 0:
+            return
+        overflow = self._buf_len + n - self._BUF_CAP
+        if overflow > 0:
+            self._evict(overflow)
+        for col, arr in cols:
+            self._buf[self._buf_len:self._buf_len + n, col] = arr
+        self._buf_len += n
+
+    def _evict(self, count):
+        # 先頭count個を捨てて前詰めする (1回のmemmoveで全列をずらす)
+        keep = self._buf_len - count
+        self._buf[:keep] = self._buf[count:self._buf_len]
+        self._buf_len = keep
+
+    def update_graph(self, ach_values, bch_values, time_values, calculated_values=None):
+        self._ingest(ach_values, bch_values, time_values, calculated_values)
+        if not self._pending_redraw:
+            self._pending_redraw = True
+            self._redraw_timer.start(33)
+
+    def _flush_redraw(self):
+        self._pending_redraw = False
+
+        # 空なら描画せずreturn
+        if self._buf_len == 0 or not self._active_artists():
+            self.canvas.draw()
+            return
+
+        max_display_time = self._max_display_time
+
+        times = self._buf[:self._buf_len, 0]
+        if max_display_time > 0:
+            min_time = max(0, times[-1] - max_display_time)
+            max_time = times[-1]
+            # 表示範囲より古いサンプルはO(log N)の二分探索で探して捨てる
+            start = int(np.searchsorted(times, min_time, side='left'))
+            if start:
+                self._evict(start)
+                times = self._buf[:self._buf_len, 0]
+        else:
+            min_time = times[0]
+            max_time = times[-1]
+
+        # モード依存の描画はモード設定時に選んだハンドラに委譲する
+        self._flush_impl(times, min_time, max_time)
+        self._draw_frame()
+
+    def _flush_jig(self, time_data, min_time, max_time):
+        self.line_calculated.set_data(time_data, self._buf[:self._buf_len, 3])
+        self.ax_calculated.set_xlim(min_time, max_time)
+        self.ax_calculated.relim()
+        self.ax_calculated.autoscale_view()
+        self._set_axis_ticks(self.ax_calculated, min_time, max_time)
+
+    def _flush_dual(self, time_data, min_time, max_time):
+        self.line_ach.set_data(time_data, self._buf[:self._buf_len, 1])
+        self.line_bch.set_data(time_data, self._buf[:self._buf_len, 2])
+        self.ax_ach.set_xlim(min_time, max_time)
+        self.ax_bch.set_xlim(min_time, max_time)
+        self.ax_ach.relim()
+        self.ax_ach.autoscale_view()
+        self.ax_bch.relim()
+        self.ax_bch.autoscale_view()
+        self._set_axis_ticks(self.ax_ach, min_time, max_time)
+        self._set_axis_ticks(self.ax_bch, min_time, max_time)
+
+    def _flush_single(self, time_data, min_time, max_time):
+        self.line_ach.set_data(time_data, self._buf[:self._buf_len, 1])
+        self.ax_ach.set_xlim(min_time, max_time)
+        self.ax_ach.relim()
+        self.ax_ach.autoscale_view()
+        self._set_axis_ticks(self.ax_ach, min_time, max_time)
+
+    def _set_axis_ticks(self, ax, x_min, x_max):
+        # 軸範囲が前フレームから変わらなければロケータ生成とグリッド再設定を省略する
+        y_min, y_max = ax.get_ylim()
+        key = (x_min, x_max, y_min, y_max)
+        if self._tick_keys.get(ax) == key:
+            return
+        self._tick_keys[ax] = key
+
+        y_range = y_max - y_min if (y_max - y_min) != 0 else 1
+        y_major_interval = y_range / 10
+        ax.yaxis.set_major_locator(MultipleLocator(y_major_interval))
+        ax.yaxis.set_minor_locator(MultipleLocator(y_major_interval / 5))
+
+        x_range = x_max - x_min if (x_max - x_min) != 0 else 1
+        x_major_interval = x_range / 10
+        ax.xaxis.set_major_locator(MultipleLocator(x_major_interval))
+        ax.xaxis.set_minor_locator(MultipleLocator(x_major_interval / 5))
+        ax.grid(True, which='both', linestyle='--', color='gray', linewidth=0.5)
+
+    def _ingest(self, ach_values, bch_values, time_values, calculated_values):
+        self._append_samples(time_values, ach_values, bch_values, calculated_values)
+
+        # ラベル表示
+        if self.jig_mode and calculated_values is not None and len(calculated_values):
+            latest_value = calculated_values[-1]
+            if latest_value is None or latest_value == 'Overload' or not _isfinite(latest_value):
+                calculated_text = f"{self.calculated_value_desc}: Overload"
+            else:
+                if self.calculated_unit:
+                    formatted_value = _fmt_si_cached(latest_value, self.calculated_unit)
+                else:
+                    formatted_value = f"{latest_value:.3f}"
+                calculated_text = f"{self.calculated_value_desc}: {formatted_value}"
+            if calculated_text != self._last_calculated_text:
+                self.value_label_calculated.setText(calculated_text)
+                self._last_calculated_text = calculated_text
+        else:
+            if ach_values is not None and len(ach_values):
+                latest_ach_value = ach_values[-1]
+                if latest_ach_value == 'Overload' or _isnan(latest_ach_value):
+                    ach_text = f"{self.ach_desc}: Overload"
+                else:
+                    formatted_value = _fmt_si_cached(latest_ach_value, self.ach_unit)
+                    ach_text = f"{self.ach_desc}: {formatted_value}"
+                if ach_text != self._last_ach_text:
+                    self.value_label_ach.setText(ach_text)
+                    self._last_ach_text = ach_text
+            if self.bch_desc and bch_values is not None and len(bch_values):
+                latest_bch_value = bch_values[-1]
+                if latest_bch_value == 'Overload' or _isnan(latest_bch_value):
+                    bch_text = f"{self.bch_desc}: Overload"
+                else:
+                    formatted_value = _fmt_si_cached(latest_bch_value, self.bch_unit)
+                    bch_text = f"{self.bch_desc}: {formatted_value}"
+                if bch_text != self._last_bch_text:
+                    self.value_label_bch.setText(bch_text)
+                    self._last_bch_text = bch_text
+
+        if self.recording:
+            if self.jig_mode and calculated_values is not None and len(calculated_values):
+                rows = [(t, c_val) for t, c_val in zip(time_values, calculated_values)
+                        if _isfinite(c_val)]
+            else:
+                # bch_values が無いモードでは None 列で埋めて安全にzipする
+                combined_b = (bch_values if bch_values is not None and len(bch_values)
+                              else [None] * len(ach_values))
+                if self.bch_desc:
+                    rows = list(zip(time_values, ach_values, combined_b))
+                else:
+                    rows = list(zip(time_values, ach_values))
+            self._record_rows(rows)
+
+    def _record_rows(self, rows):
+        n = len(rows)
+        if n == 0:
+            return
+        if self._rec_len + n > self._rec_buf.shape[0]:
+            if self._rec_buf.shape[0] < self._REC_CAP:
+                new_cap = min(self._REC_CAP, max(self._rec_buf.shape[0] * 2, self._rec_len + n))
+                self._rec_buf = np.resize(self._rec_buf, (new_cap, 3))
+            overflow = self._rec_len + n - self._rec_buf.shape[0]
+            if overflow > 0:
+                # 上限到達後は最古の行をまとめて捨てる (償却のため1/4単位で立ち退き)
+                drop = max(overflow, self._rec_buf.shape[0] // 4)
+                keep = self._rec_len - drop
+                self._rec_buf[:keep] = self._rec_buf[drop:self._rec_len]
+                self._rec_len = keep
+        block = self._rec_buf[self._rec_len:self._rec_len + n]
+        for col in range(self._rec_cols):
+            block[:, col] = self._coerce_floats([row[col] for row in rows])
+        self._rec_len += n
+
+    def toggle_recording(self):
+        if not self.recording:
+            self.recording = True
+            self._rec_len = 0
+            self._rec_cols = 2 if (self.jig_mode or not self.bch_desc) else 3
+            self.recording_button.setText("記録停止")
+        else:
+            self.recording = False
+            self.recording_button.setText("記録開始")
+            self.save_recorded_data()
+
+    def save_recorded_data(self):
+        if not self._rec_len:
+            QMessageBox.information(self, "情報", "記録されたデータがありません。")
+            return
+
+        options = QFileDialog.Options()
+        options |= QFileDialog.DontUseNativeDialog
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "CSVファイルに保存", "", "CSV Files (*.csv);;All Files (*)", options=options
+        )
+        if file_path:
+            if self.jig_mode:
+                header = ["時間 (秒)", f"{self.calculated_value_desc} ({self.calculated_unit})"]
+            elif self.bch_desc:
+                header = ["時間 (秒)",
+                          f"{self.ach_desc} ({self.ach_unit})",
+                          f"{self.bch_desc} ({self.bch_unit})"]
+            else:
+                header = ["時間 (秒)", f"{self.ach_desc} ({self.ach_unit})"]
+
+            # GUIスレッドをブロックしないよう、スナップショットを書き込みスレッドに渡す
+            data = self._rec_buf[:self._rec_len, :self._rec_cols].copy()
+            self._io_pool.submit(self._write_csv, file_path, header, data)
+
+    def _write_csv(self, file_path, header, data):
+        try:
+            with open(file_path, mode='w', newline='', buffering=1 << 20) as file:
+                csv.writer(file).writerow(header)
+                # タイムスタンプと6.5桁超の読み値を丸めないよう12有効桁で書き出す
+                np.savetxt(file, data, delimiter=',', fmt='%.12g')
+            self.save_finished.emit(True, file_path)
+        except Exception as e:
+            self.save_finished.emit(False, str(e))
+
+    def _on_save_finished(self, success, detail):
+        if success:
+            QMessageBox.information(self, "成功", f"データを{detail}に保存しました。")
+        else:
+            QMessageBox.critical(self, "エラー", f"データの保存に失敗しました。\n{detail}")
+
+    def _reset_lines_only(self):
+        # 軸構成は変わらないので、Figureを作り直さずライン消去と範囲リセットだけ行う
+        for ax, line in self._active_artists():
+            line.set_data([], [])
+            ax.set_xlim(0, self._max_display_time)
+            ax.relim()
+            ax.autoscale_view()
+        self._blit_bg = None
+        self._tick_keys.clear()
+        self._draw_frame()
+
+    def reset_graph(self):
+        self._redraw_timer.stop()
+        self._pending_redraw = False
+        # プログラムからの書き戻しでeditingFinishedを発火させない
+        with QSignalBlocker(self.time_input):
+            self.time_input.setText("10")
+        self._max_display_time = 10.0
+        self._buf_len = 0
+        self.start_time = time.time()
+        if self._active_artists():
+            self._reset_lines_only()
+        else:
+            self.set_measurement_mode_descriptions(
+                self.ach_desc,
+                self.bch_desc,
+                self.jig_mode,
+                self.calculated_value_desc,
+                self.calculated_unit
+            )
+        self._rec_len = 0
+
+
+class DMMApp(QMainWindow):
+    def __init__(self):
+        super().__init__(parent=None)
+        self.is_ready_event = None
+        self.setup_timer = None
+        self.setup_dialog = None
+        self.rm = rm
+        self.resources = self.rm.list_resources()
+        self.selected_resource = None
+        self.trigger_mode = None
+        self.measurement_mode_ach = None
+        self.measurement_mode_bch = None
+        self.ach_unit = ""
+        self.bch_unit = ""
+        self.jig_mode = False
+        self.jig_mode_name = None
+        self._jig_mode_id = None
+        self.calculated_value_desc = ""
+        self.calculated_unit = ""
+
+        self.jig_modes = [
+            ("四端子抵抗測定A_V", "F1", "F35"),
+            ("四端子抵抗測定B_V", "F12", "F5"),
+            ("hFE測定", "F5", "F35"),
+            ("電力計測(小電流)", "F5", "F12"),
+            ("電力計測(大電流)", "F1", "F35"),
+        ]
+
+        self.setWindowTitle("7352A/E コントローラー")
+        self.setGeometry(100, 100, 1920, 1080)
+        self.setFont(_point_font(14))
+
+        self.stacked_widget = QStackedWidget(parent=None)
+        self.setCentralWidget(self.stacked_widget)
+
+        self.device_selection_page = DeviceSelectionPage(self.resources)
+        self.dmm_setup_page = DMMSetupPage(self.jig_modes)
+        self.mode_selection_page = ModeSelectionPage()
+        self.value_display_page = ValueDisplayPage()
+        # グラフページはFigure/Canvasの生成が重いので、初回表示まで作らない
+        self.graph_display_page = None
+
+        self.stacked_widget.addWidget(self.device_selection_page)
+        self.stacked_widget.addWidget(self.dmm_setup_page)
+        self.stacked_widget.addWidget(self.mode_selection_page)
+        self.stacked_widget.addWidget(self.value_display_page)
+
+        self.device_selection_page.next_button.clicked.connect(self.go_to_dmm_setup)
+        self.dmm_setup_page.next_button.clicked.connect(self.go_to_mode_selection)
+        self.mode_selection_page.value_display_button.clicked.connect(self.go_to_value_display)
+        self.mode_selection_page.graph_display_button.clicked.connect(self.go_to_graph_display)
+        self.value_display_page.switch_display_button.clicked.connect(self.switch_display_mode)
+        self.value_display_page.trigger_button.clicked.connect(self.send_trigger)
+
+        self.mode_selection_page.reset_button.clicked.connect(self.reset_application)
+        self.value_display_page.reset_button.clicked.connect(self.reset_application)
+
+        self.stacked_widget.setCurrentWidget(self.device_selection_page)
+
+        self.command_queue = queue.SimpleQueue()
+        # ティック用ハンドラ (測定モード確定時にジグ用へ差し替える)
+        self._value_update = self._update_value_raw
+        self._graph_update = self._update_graph_raw
+        self.data_ring = SampleRing(100_000)
+        self.measurement_process = None
+        self.stop_event = Event()
+        self.timer = None
+        self.last_read_index = 0
+
+    def switch_display_mode(self):
+        self.stacked_widget.setCurrentWidget(self.mode_selection_page)
+
+    def go_to_dmm_setup(self):
+        self.selected_resource = self.device_selection_page.combo.currentText()
+        if not self.selected_resource:
+            QMessageBox.warning(self, "警告", "機器を選択してください。")
+            return
+        self.stacked_widget.setCurrentWidget(self.dmm_setup_page)
+
+    def go_to_mode_selection(self):
+        commands = self.dmm_setup_page.get_setup_commands()
+        if not commands:
+            return
+        self.trigger_mode = self.dmm_setup_page.get_trigger_mode()
+        (self.measurement_mode_ach_desc, self.measurement_mode_ach, self.ach_unit), \
+            (self.measurement_mode_bch_desc, self.measurement_mode_bch, self.bch_unit) = \
+            self.dmm_setup_page.get_measurement_modes()
+
+        mode_id = self.dmm_setup_page.mode_group.checkedId()
+        self.jig_mode = (mode_id == 1)
+        if self.jig_mode:
+            self.jig_mode_name = self.dmm_setup_page.jig_selection_combo.currentText()
+            # 計算式IDはここで一度だけ引き、毎ティックの辞書参照を省く
+            self._jig_mode_id = _JIG_MODE_IDS.get(self.jig_mode_name)
+            if self.jig_mode_name in ("四端子抵抗測定A_V", "四端子抵抗測定B_V"):
+                self.calculated_value_desc = "抵抗値"
+                self.calculated_unit = "Ω"
+            elif self.jig_mode_name == "hFE測定":
+                self.calculated_value_desc = "hFE"
+                self.calculated_unit = ""
+            elif self.jig_mode_name in ("電力計測(小電流)", "電力計測(大電流)"):
+                self.calculated_value_desc = "電力"
+                self.calculated_unit = "W"
+            else:
+                self.calculated_value_desc = ""
+                self.calculated_unit = ""
+        else:
+            self.jig_mode_name = None
+            self._jig_mode_id = None
+            self.calculated_value_desc = ""
+            self.calculated_unit = ""
+
+        self.value_display_page.set_measurement_mode_descriptions(
+            self.measurement_mode_ach_desc,
+            self.measurement_mode_bch_desc,
+            self.jig_mode,
+            calculated_value_desc=self.calculated_value_desc,
+            calculated_unit=self.calculated_unit
+        )
+        self._value_update = self._update_value_jig if self.jig_mode else self._update_value_raw
+        self._graph_update = self._update_graph_jig if self.jig_mode else self._update_graph_raw
+
+        if self.graph_display_page is not None:
+            self.graph_display_page.set_measurement_mode_descriptions(
+                self.measurement_mode_ach_desc,
+                self.measurement_mode_bch_desc,
+                self.jig_mode,
+                calculated_value_desc=self.calculated_value_desc,
+                calculated_unit=self.calculated_unit
+            )
+
+        self.start_measurement(commands)
+
+        self.setup_dialog = QDialog(self)
+        self.setup_dialog.setWindowTitle("DMMセットアップ中")
+        layout = QVBoxLayout()
+        label = QLabel("DMMセットアップ中... お待ちください。")
+        layout.addWidget(label)
+        self.setup_dialog.setLayout(layout)
+        self.setup_dialog.setModal(True)
+
+        self.setup_timer = QTimer(self.setup_dialog)
+        self.setup_timer.timeout.connect(self.check_dmm_ready)
+        self.setup_timer.start(100)
+
+        self.setup_dialog.show()
+        self.stacked_widget.setCurrentWidget(self.mode_selection_page)
+
+    def check_dmm_ready(self):
+        if self.is_ready_event.is_set():
+            self.setup_timer.stop()
+            self.setup_dialog.accept()
+            self.stacked_widget.setCurrentWidget(self.mode_selection_page)
+
+    def start_measurement(self, setup_commands):
+        if self.measurement_process and self.measurement_process.is_alive():
+            self.stop_measurement()
+        self.stop_event.clear()
+
+        self.is_ready_event = Event()
+        self.measurement_process = MeasurementClass(
+            self.command_queue,
+            self.data_ring,
+            self.selected_resource,
+            self.stop_event,
+            self.is_ready_event
+        )
+        self.measurement_process.start()
+
+        self.command_queue.put("SEND *RST")
+        for cmd in setup_commands:
+            self.command_queue.put(f"SEND {cmd}")
+
+        # 固定周期ではなく、1回ごとに次回を予約するシングルショット連鎖にする
+        # (1ティックが20msを超えても、Qtのイベントループにタイマが積み上がらない)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._tick)
+        self._poll_interval = 20
+        self._idle_ticks = 0
+        self.timer.start(self._poll_interval)
+
+    def go_to_value_display(self):
+        self.stacked_widget.setCurrentWidget(self.value_display_page)
+        if self.trigger_mode == "TRS3":
+            self.value_display_page.trigger_button.setEnabled(True)
+        else:
+            self.value_display_page.trigger_button.setEnabled(False)
+
+    def _ensure_graph_display_page(self):
+        # 初回のみグラフページを生成してシグナルを配線し、現在の測定モードを反映する
+        if self.graph_display_page is None:
+            self.graph_display_page = GraphDisplayPage()
+            self.stacked_widget.addWidget(self.graph_display_page)
+            self.graph_display_page.switch_display_button.clicked.connect(self.switch_display_mode)
+            self.graph_display_page.trigger_button.clicked.connect(self.send_trigger)
+            self.graph_display_page.reset_button.clicked.connect(self.reset_application)
+            self.graph_display_page.set_measurement_mode_descriptions(
+                self.measurement_mode_ach_desc,
+                self.measurement_mode_bch_desc,
+                self.jig_mode,
+                calculated_value_desc=self.calculated_value_desc,
+                calculated_unit=self.calculated_unit
+            )
+        return self.graph_display_page
+
+    def go_to_graph_display(self):
+        self._ensure_graph_display_page()
+        self.stacked_widget.setCurrentWidget(self.graph_display_page)
+        if self.trigger_mode == "TRS3":
+            self.graph_display_page.trigger_button.setEnabled(True)
+        else:
+            self.graph_display_page.trigger_button.setEnabled(False)
+
+        _, t, a, b = self.data_ring.read_since(0)
+        self.graph_display_page.load_data_from_arrays(
+            t, a, b, self.jig_mode, self.jig_mode_name, self.measurement_mode_bch
+        )
+
+    def _tick(self):
+        start = time.perf_counter()
+        self.update_from_shared_memory()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        # 処理に時間がかかったら次回を遅らせて、追いつく余裕を作る
+        self.timer.start(max(self._poll_interval, int(elapsed_ms * 2)))
+
+    def update_from_shared_memory(self):
+        # 表示ページにいない間は未読位置だけ進めてO(1)で抜ける
+        current = self.stacked_widget.currentWidget()
+        if current is not self.value_display_page and current is not self.graph_display_page:
+            self.last_read_index = self.data_ring.cursor
+            return
+
+        # リングバッファから未読分をゼロコピーのビューで受け取る
+        end, time_values, ach_values, bch_values = self.data_ring.read_since(self.last_read_index)
+        if end == self.last_read_index:
+            # 空ティックが続いたらポーリングを100msまで落として待機中のCPUを節約する
+            self._idle_ticks += 1
+            if self._idle_ticks == 2:
+                self._poll_interval = 100
+            return
+        self._poll_interval = 20
+        self._idle_ticks = 0
+        self.last_read_index = end
+
+        # モード分岐はセットアップ時に選んだハンドラに委譲する
+        if current is self.value_display_page:
+            self._value_update(time_values, ach_values, bch_values)
+        elif current is self.graph_display_page:
+            self._graph_update(time_values, ach_values, bch_values)
+
+    # 値表示 (最後の1サンプルしか使わないので、ジグ計算も末尾だけ行う)
+    def _update_value_jig(self, time_values, ach_values, bch_values):
+        self.value_display_page.update_values(
+            ach_value=None,
+            bch_value=None,
+            calculated_value=float(
+                _jig_calc(self._jig_mode_id, ach_values[-1:], bch_values[-1:])[0]
+            ),
+            ach_unit=self.ach_unit,
+            bch_unit=self.bch_unit,
+            calculated_unit=self.calculated_unit,
+            jig_mode=True
+        )
+
+    def _update_value_raw(self, time_values, ach_values, bch_values):
+        self.value_display_page.update_values(
+            ach_value=float(ach_values[-1]),
+            bch_value=float(bch_values[-1]) if self.measurement_mode_bch else None,
+            calculated_value=None,
+            ach_unit=self.ach_unit,
+            bch_unit=self.bch_unit,
+            jig_mode=False
+        )
+
+    # グラフ表示 (スライス全体を一括計算して渡す)
+    def _update_graph_jig(self, time_values, ach_values, bch_values):
+        self.graph_display_page.update_graph(
+            ach_values=[],
+            bch_values=[],
+            time_values=time_values,
+            calculated_values=_jig_calc(self._jig_mode_id, ach_values, bch_values)
+        )
+
+    def _update_graph_raw(self, time_values, ach_values, bch_values):
+        self.graph_display_page.update_graph(
+            ach_values=ach_values,
+            bch_values=bch_values if self.measurement_mode_bch else None,
+            time_values=time_values
+        )
+
+    def stop_measurement(self):
+        if self.measurement_process and self.measurement_process.is_alive():
+            self.command_queue.put("STOP")
+            self.measurement_process.join()
+            self.measurement_process = None
+        if self.timer and self.timer.isActive():
+            self.timer.stop()
+        self.stacked_widget.setCurrentWidget(self.mode_selection_page)
+
+    def send_trigger(self):
+        if self.trigger_mode == "TRS3":
+            self.command_queue.put("TRIGGER")
+
+    def reset_application(self):
+        if self.measurement_process and self.measurement_process.is_alive():
+            self.command_queue.put("STOP")
+            self.measurement_process.join()
+            self.measurement_process = None
+        self.selected_resource = None
+        self.trigger_mode = None
+        self.measurement_mode_ach = None
+        self.measurement_mode_bch = None
+        self.ach_unit = ""
+        self.bch_unit = ""
+        self.jig_mode = False
+        self.jig_mode_name = None
+        self._jig_mode_id = None
+        self.calculated_value_desc = ""
+        self.calculated_unit = ""
+
+        if self.graph_display_page is not None:
+            self.graph_display_page.reset_graph()
+        self.value_display_page.set_measurement_mode_descriptions("", "", self.jig_mode)
+        self.stacked_widget.setCurrentWidget(self.device_selection_page)
+
+    def closeEvent(self, event, *args, **kwargs):
+        if self.measurement_process and self.measurement_process.is_alive():
+            self.command_queue.put("STOP")
+            self.measurement_process.join()
+        event.accept()
+
+
+def main():
+    app = QApplication(sys.argv)
+    app.setFont(_point_font(14), "QLabel")
+
+    window = DMMApp()
+    window.show()
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()